@@ -1,42 +1,73 @@
 import logging
-import requests
 from PyQt5.QtCore import QObject, pyqtSlot
 
 from interface.environment_variables import EnvironmentVariable
 from services.notification_manager import NotificationManager
-from services.variable_service import VariableService
+from services.variable_repository import VariableRepository
 from services.preferences_service import PreferencesService
-from services.workers.path_worker import PathWorker
+from services.http_client import HttpClient
+from services.resolution_engine import extract, parse_response
+from services.variable_fetcher import inflight
+from services.workers.path_worker import BatchPathWorker, CANCELLED_MESSAGE, PathWorker
+from services.workers.variable_test_worker import TestResult, VariableTestWorker
+from services.workers.worker_pool import JobHandle, PathWorkerPool, QueueFullError
 
 logger = logging.getLogger("EnvironmentController")
 
+DEFAULT_STREAM_MAX_BYTES = 256 * 1024 * 1024
+
+
+def _test_key(name: str) -> str:
+    """Chave dos testes no pool: trocar a seleção não os cancela."""
+    return f"test:{name}"
+
+
 class EnvironmentController(QObject):
-    def __init__(self, view):
+    def __init__(self, view, repository: VariableRepository | None = None):
         super().__init__()
         self.view      = view
-        self.var_svc   = VariableService()
-        self.pref_svc  = PreferencesService()
+        self.repo      = repository if repository is not None else VariableRepository.instance()
+        self.pref_svc  = PreferencesService.shared()
         self.notifier  = NotificationManager()
-        self._vars     = []
-        self._workers = []
+        self.workers   = PathWorkerPool(
+            max_threads=self.pref_svc.get("resolver_pool_size", 4),
+            max_queue=self.pref_svc.get("resolver_queue_limit", 32),
+            parent=self,
+        )
+        self._selected_name = None
+        self._tests: dict[str, JobHandle] = {}
+        # resposta interpretada da variável selecionada: (nome, texto, dado)
+        self._selected_parse: tuple[str, str, object] | None = None
 
         view.variableSelected.connect(self.on_variable_selected)
         view.variableChanged.connect(self.on_variable_changed)
         view.variableAdded.connect(self.on_variable_added)
         view.variableRemoved.connect(self.on_variable_removed)
         view.variableTested.connect(self.on_variable_tested)
+        view.variableTestCancelled.connect(self.on_variable_test_cancelled)
         view.splitterMoved.connect(self.on_splitter_moved)
         view.splitDirectionToggled.connect(self.on_split_direction_toggled)
 
         self.load()
+        self._prewarm_connections()
+
+    def _prewarm_connections(self):
+        if not self.pref_svc.get("prewarm_connections", False):
+            return
+        try:
+            HttpClient.shared().prewarm(
+                v.url for v in self.repo.variables if v.enabled and v.type == "http"
+            )
+        except Exception as e:
+            logger.error(f"Falha ao pré-aquecer conexões HTTP: {e}")
 
     def load(self):
         try:
-            self._vars = self.var_svc.load_all()
-            self.view.set_variables(self._vars)
-            if self._vars:
+            self.repo.load()
+            self.view.set_variables(self.repo.variables)
+            if len(self.repo):
                 self.view.select_row(0)
-                self.view.show_variable(self._vars[0])
+                self.view.show_variable(self.repo[0])
             #logger.info("Variáveis carregadas com sucesso")
         except Exception as e:
             logger.error(f"Falha ao carregar variáveis: {e}")
@@ -48,75 +79,167 @@ class EnvironmentController(QObject):
         except Exception as e:
             logger.error(f"Falha ao restaurar splitter: {e}")
 
+    def shutdown(self):
+        """Grava alterações pendentes antes de encerrar a aplicação."""
+        self.workers.shutdown()
+        stats = inflight.stats()
+        if stats["hits"]:
+            logger.info(f"Resoluções HTTP compartilhadas: {stats['hits']} de {stats['hits'] + stats['misses']}")
+        try:
+            self.repo.close()
+        except Exception as e:
+            logger.error(f"Falha ao gravar variáveis pendentes: {e}")
+        try:
+            self.pref_svc.close()
+        except Exception as e:
+            logger.error(f"Falha ao gravar preferências pendentes: {e}")
+        HttpClient.shared().close()
+
     def fetch_path(self,
                    path: str,
                    on_success: callable,
                    on_error: callable,
-                   on_finished: callable):
+                   on_finished: callable) -> JobHandle | None:
         """
-        Dispara um PathWorker em thread separada.
+        Enfileira um PathWorker no pool de resolução.
         on_success(value) é chamado com o resultado final.
-        on_error(err_msg) é chamado se houver exceção.
+        on_error(err_msg) é chamado se houver exceção ou cancelamento.
         on_finished() é chamado sempre ao final.
+        Retorna o handle do job (cancelável), ou None se a fila estiver cheia.
+        Respostas HTTP são lidas em streaming até `stream_max_bytes` (preferência;
+        0 desativa o streaming).
         """
-        worker = PathWorker(path, list(self._vars))
+        max_bytes = self.pref_svc.get("stream_max_bytes", DEFAULT_STREAM_MAX_BYTES)
+        worker = PathWorker(path, self.repo.snapshot(), stream_max_bytes=max_bytes or None)
         worker.success.connect(on_success)
         worker.error.connect(on_error)
         worker.finished.connect(on_finished)
-        self._workers.append(worker)
-        worker.start()
+        try:
+            return self.workers.submit(worker)
+        except QueueFullError as e:
+            logger.warning(f"Resolução de '{path}' descartada: {e}")
+            on_error(str(e))
+            on_finished()
+            return None
+
+    def fetch_paths(self,
+                    paths: list[str],
+                    on_done: callable = None,
+                    on_partial: callable = None,
+                    on_error: callable = None,
+                    on_finished: callable = None) -> JobHandle | None:
+        """
+        Resolve vários caminhos num único job, buscando cada variável raiz
+        no máximo uma vez.
+        on_partial(path, PathResult) é chamado à medida que cada caminho fica pronto.
+        on_done(results) recebe o dicionário caminho → PathResult ao final.
+        on_error(err_msg) é chamado se o lote inteiro falhar ou for cancelado.
+        on_finished() é chamado sempre ao final.
+        """
+        worker = BatchPathWorker(paths, self.repo.snapshot())
+        for signal, callback in ((worker.success, on_done), (worker.partial, on_partial),
+                                 (worker.error, on_error), (worker.finished, on_finished)):
+            if callback is not None:
+                signal.connect(callback)
+        try:
+            return self.workers.submit(worker)
+        except QueueFullError as e:
+            logger.warning(f"Resolução de {len(paths)} caminhos descartada: {e}")
+            if on_error is not None:
+                on_error(str(e))
+            if on_finished is not None:
+                on_finished()
+            return None
 
     @pyqtSlot(int)
     def on_variable_selected(self, index):
-        if index < 0 or index >= len(self._vars):
+        if index < 0 or index >= len(self.repo):
             logger.warning(f"Seleção de variável inválida: {index}")
             return
         try:
-            self.view.show_variable(self._vars[index])
+            var = self.repo[index]
+            if self._selected_name is not None and self._selected_name != var.name:
+                self.workers.cancel(self._selected_name)
+                self._selected_parse = None
+            self._selected_name = var.name
+            self.view.show_variable(var)
+            self.view.http_editor.set_testing(var.name in self._tests)
         except Exception as e:
             logger.error(f"Erro ao exibir variável no índice {index}: {e}")
 
     @pyqtSlot(int, object)
     def on_variable_changed(self, index, updated):
-        if index < 0 or index >= len(self._vars):
+        if index < 0 or index >= len(self.repo):
             logger.warning(f"Índice de edição inválido: {index}")
             return
 
-        var = self._vars[index]
         try:
             if isinstance(updated, dict) and set(updated.keys()) >= {"name", "enabled", "type"}:
-                var.name    = updated["name"]
-                var.enabled = updated["enabled"]
-                var.type    = updated["type"]
+                fields = {
+                    "name": updated["name"],
+                    "enabled": updated["enabled"],
+                    "type": updated["type"],
+                }
 
             elif isinstance(updated, str):
-                var.value = updated
+                fields = {"value": updated}
 
             elif isinstance(updated, dict):
-                var.type = "http"
-                var.content_type = updated.get("content_type", "application/json")
-                var.method = updated.get("method")
-                var.url = updated.get("url")
-                var.params = updated.get("params", {})
-                var.headers = updated.get("headers", {})
-                if var.content_type == "application/x-www-form-urlencoded":
-                    var.body_params = updated.get("body_params", {})
-                    var.body = updated.get("body", "")
+                fields = {
+                    "type": "http",
+                    "content_type": updated.get("content_type", "application/json"),
+                    "method": updated.get("method"),
+                    "url": updated.get("url"),
+                    "params": updated.get("params", {}),
+                    "headers": updated.get("headers", {}),
+                    "body": updated.get("body", ""),
+                    "extract_path": updated.get("extract_path", ""),
+                    "cache_ttl": updated.get("cache_ttl"),
+                }
+                if fields["content_type"] == "application/x-www-form-urlencoded":
+                    fields["body_params"] = updated.get("body_params", {})
                 else:
-                    var.body = updated.get("body", "")
-                    var.body_params = {}
-                var.extract_path = updated.get("extract_path", "")
+                    fields["body_params"] = {}
 
-            self.var_svc.save_all(self._vars)
+            else:
+                return
+
+            changed = self.repo.update(index, **fields)
+            if "extract_path" in changed:
+                var = self.repo[index]
+                self.repo.update(index, extracted_value=self._extracted_value(var, var.response))
         except Exception as e:
             logger.error(f"Falha ao salvar variável no índice {index}: {e}")
 
+    def _parsed_response(self, var: EnvironmentVariable, response_text: str):
+        """
+        Resposta interpretada. Só a da variável selecionada é guardada, e é
+        reaproveitada enquanto o texto não mudar: editar `extract_path` não
+        volta a fazer `json.loads` da resposta inteira.
+        """
+        cached = self._selected_parse
+        if (cached is not None and cached[0] == var.name
+                and (cached[1] is response_text or cached[1] == response_text)):
+            return cached[2]
+        data = parse_response(response_text)
+        if var.name == self._selected_name:
+            self._selected_parse = (var.name, response_text, data)
+        return data
+
+    def _extracted_value(self, var: EnvironmentVariable, response_text: str):
+        """Pré-calcula o valor de `extract_path` sobre a resposta armazenada."""
+        if not var.extract_path or not response_text:
+            return None
+        try:
+            return extract(var, self._parsed_response(var, response_text))
+        except (KeyError, ValueError) as e:
+            logger.warning(f"Extração '{var.extract_path}' falhou para '{var.name}': {e}")
+            return None
+
     @pyqtSlot(object)
     def on_variable_added(self, var: EnvironmentVariable):
         try:
-            self._vars.append(var)
-            self.var_svc.save_all(self._vars)
-            idx = len(self._vars) - 1
+            idx = self.repo.add(var)
             self.view.select_row(idx)
             self.view.show_variable(var)
             logger.info(f"Nova variável '{var.name}' adicionada e exibida")
@@ -125,17 +248,21 @@ class EnvironmentController(QObject):
 
     @pyqtSlot(int)
     def on_variable_removed(self, index: int):
-        if index < 0 or index >= len(self._vars):
+        if index < 0 or index >= len(self.repo):
             logger.warning(f"Índice de remoção inválido: {index}")
             return
         try:
-            removed = self._vars.pop(index)
-            self.var_svc.save_all(self._vars)
+            removed = self.repo.remove(index)
+            if self._selected_parse is not None and self._selected_parse[0] == removed.name:
+                self._selected_parse = None
+            self._tests.pop(removed.name, None)
+            self.workers.cancel(removed.name)
+            self.workers.cancel(_test_key(removed.name))
             logger.info(f"Variável '{removed.name}' removida com sucesso")
-            if self._vars:
-                next_idx = min(index, len(self._vars) - 1)
+            if len(self.repo):
+                next_idx = min(index, len(self.repo) - 1)
                 self.view.select_row(next_idx)
-                self.view.show_variable(self._vars[next_idx])
+                self.view.show_variable(self.repo[next_idx])
             else:
                 self.view.static_editor.hide()
                 self.view.http_editor.hide()
@@ -145,39 +272,85 @@ class EnvironmentController(QObject):
 
     @pyqtSlot(int)
     def on_variable_tested(self, index: int):
-        if index < 0 or index >= len(self._vars):
+        if index < 0 or index >= len(self.repo):
             logger.warning(f"Índice de teste inválido: {index}")
             return
-        var = self._vars[index]
+        var = self.repo[index]
+        if var.name in self._tests:
+            return
+
+        worker = VariableTestWorker(var, self.repo.snapshot())
+        worker.success.connect(lambda resp, name=var.name: self._on_test_success(name, resp))
+        worker.error.connect(lambda err, name=var.name: self._on_test_error(name, err))
+        worker.finished.connect(lambda name=var.name, w=worker: self._on_test_finished(name, w))
         try:
-            if var.content_type == "application/x-www-form-urlencoded":
-                data = var.body_params
-            else:
-                data = var.body.encode("utf-8") if var.body else None
-
-            response = requests.request(
-                method=var.method or "GET",
-                url=var.url,
-                params=var.params,
-                headers=var.headers,
-                data=data,
-                timeout=10
-            )
-            var.response = response.text
-            self.var_svc.save_all(self._vars)
-            self.view.http_editor.response_te.setPlainText(var.response)
-            self.notifier.notify("Teste concluído", f"{var.name}: {response.status_code}", 1500)
-            logger.info(f"Teste HTTP da variável '{var.name}' concluído com status {response.status_code}")
-        except Exception as e:
-            logger.error(f"Erro ao testar variável '{var.name}': {e}")
+            self._tests[var.name] = self.workers.submit(worker, key=_test_key(var.name))
+        except QueueFullError as e:
             self.notifier.notify("Teste falhou", str(e), 2000)
+            return
+        self.view.http_editor.set_testing(True)
+
+    @pyqtSlot(int)
+    def on_variable_test_cancelled(self, index: int):
+        if index < 0 or index >= len(self.repo):
+            return
+        name = self.repo[index].name
+        handle = self._tests.pop(name, None)
+        if handle is None:
+            return
+        # a requisição em curso não é interrompida; seu resultado é descartado
+        handle.cancel()
+        if self._is_shown(name):
+            self.view.http_editor.set_testing(False)
+        self.notifier.notify("Teste cancelado", name, 1200)
+
+    def _index_of(self, name: str) -> int:
+        for i, var in enumerate(self.repo.snapshot()):
+            if var.name == name:
+                return i
+        return -1
+
+    def _is_shown(self, name: str) -> bool:
+        row = self.view.table.currentRow()
+        return 0 <= row < len(self.repo) and self.repo[row].name == name
+
+    def _on_test_success(self, name: str, result: TestResult):
+        index = self._index_of(name)
+        if index < 0:
+            return
+        try:
+            var = self.repo[index]
+            extracted = result.extracted_value
+            if (var.extract_path or "") != result.extract_path:
+                # `extract_path` mudou durante o teste
+                extracted = self._extracted_value(var, result.text)
+            self.repo.update(index, response=result.text, extracted_value=extracted)
+            if self._is_shown(name):
+                self.view.http_editor.set_response(result.text)
+            self.notifier.notify("Teste concluído", f"{name}: {result.status_code}", 1500)
+            logger.info(f"Teste HTTP da variável '{name}' concluído com status {result.status_code}")
+        except Exception as e:
+            logger.error(f"Erro ao aplicar resultado do teste de '{name}': {e}")
+
+    def _on_test_error(self, name: str, err: str):
+        if err != CANCELLED_MESSAGE:
+            self.notifier.notify("Teste falhou", err, 2000)
+
+    def _on_test_finished(self, name: str, worker: VariableTestWorker):
+        handle = self._tests.get(name)
+        if handle is None or handle.worker is not worker:
+            return
+        del self._tests[name]
+        if self._is_shown(name):
+            self.view.http_editor.set_testing(False)
 
     @pyqtSlot(str, list)
     def on_splitter_moved(self, orientation, sizes):
         try:
-            self.pref_svc.set("splitter_orientation", orientation)
-            self.pref_svc.set(f"splitter_sizes_{orientation}", sizes)
-            logger.info(f"Configuração do splitter salva: {orientation} {sizes}")
+            self.pref_svc.set_many({
+                "splitter_orientation": orientation,
+                f"splitter_sizes_{orientation}": sizes,
+            })
         except Exception as e:
             logger.error(f"Erro ao salvar configuração do splitter: {e}")
 
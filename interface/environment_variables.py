@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 
 @dataclass
 class EnvironmentVariable:
@@ -16,3 +16,5 @@ class EnvironmentVariable:
     body_params: Dict[str, str] = field(default_factory=dict)
     response: Optional[str] = ""
     extract_path: Optional[str] = ""
+    cache_ttl: Optional[int] = None
+    extracted_value: Any = None
@@ -12,7 +12,7 @@ from presentation.components.placeholder_environment_suggestion import (
     PlaceholderLineEdit,
 )
 from services.notification_manager import NotificationManager
-from services.variable_service import VariableService
+from services.variable_repository import VariableRepository
 from utils.utilities import get_style_sheet
 
 logging.basicConfig(
@@ -36,13 +36,15 @@ class ApplicationManager:
             central = QWidget()
             v_layout = QVBoxLayout(central)
 
-            var_svc = VariableService()
-            provider = PlaceholderSuggestionProvider(var_svc)
+            repository = VariableRepository.instance()
+            provider = PlaceholderSuggestionProvider(repository)
             self.url_le = PlaceholderLineEdit(provider)
             v_layout.addWidget(self.url_le)
 
             self.view = EnvironmentWidget()
-            self.controller = EnvironmentController(self.view)
+            self.controller = EnvironmentController(self.view, repository)
+            self.app.aboutToQuit.connect(self.controller.shutdown)
+            self.app.aboutToQuit.connect(provider.close)
             v_layout.addWidget(self.view)
 
             self.window.setCentralWidget(central)
@@ -6,8 +6,13 @@ from PyQt5.QtWidgets import (
     QPushButton, QCheckBox, QTableWidgetItem
 )
 from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtGui import QIntValidator
 from presentation.components.parameter_table import ParameterTableWidget
 from presentation.components.json_text_edit import JSONTextEdit
+from presentation.components.large_text_view import LargeTextView
+
+# respostas maiores (em caracteres) vão para o visualizador paginado
+LARGE_RESPONSE_CHARS = 512 * 1024
 
 class HttpEditor(QWidget):
     """
@@ -16,6 +21,7 @@ class HttpEditor(QWidget):
     Emite `configChanged` sempre que qualquer campo é modificado.
     """
     configChanged = pyqtSignal(dict)
+    testCancelled = pyqtSignal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -72,14 +78,26 @@ class HttpEditor(QWidget):
         self.response_te = JSONTextEdit()
         self.response_te.setReadOnly(True)
         layout.addWidget(self.response_te)
+        self.response_view = LargeTextView()
+        self.response_view.hide()
+        layout.addWidget(self.response_view)
 
         layout.addWidget(QLabel("Campo de extração:"))
         self.extract_le = QLineEdit()
         layout.addWidget(self.extract_le)
 
+        layout.addWidget(QLabel("Cache TTL (segundos, vazio = cabeçalhos da resposta):"))
+        self.cache_ttl_le = QLineEdit()
+        self.cache_ttl_le.setValidator(QIntValidator(0, 2**31 - 1, self))
+        layout.addWidget(self.cache_ttl_le)
+
         self.test_btn = QPushButton("Testar Variável")
         layout.addWidget(self.test_btn)
 
+        self.cancel_test_btn = QPushButton("Cancelar teste")
+        self.cancel_test_btn.hide()
+        layout.addWidget(self.cancel_test_btn)
+
     def _add_row(self, table: ParameterTableWidget):
         row = table.rowCount()
         table.insertRow(row)
@@ -93,12 +111,38 @@ class HttpEditor(QWidget):
         self.method_cb.currentTextChanged.connect(self._emit_config_changed)
         self.url_le.textChanged.connect(self._emit_config_changed)
         self.extract_le.textChanged.connect(self._emit_config_changed)
+        self.cache_ttl_le.textChanged.connect(self._emit_config_changed)
         self.params_table.cellChanged.connect(lambda r, c: self._emit_config_changed())
         self.headers_table.cellChanged.connect(lambda r, c: self._emit_config_changed())
         self.content_type_cb.currentTextChanged.connect(self._update_body_editor_visibility)
         self.body_te.textChanged.connect(self._emit_config_changed)
         self.response_te.textChanged.connect(self._emit_config_changed)
         self.test_btn.clicked.connect(lambda: self._emit_config_changed())
+        self.cancel_test_btn.clicked.connect(self.testCancelled.emit)
+
+    def set_testing(self, testing: bool):
+        """Mostra o estado de teste em andamento e o botão de cancelar."""
+        self.test_btn.setEnabled(not testing)
+        self.test_btn.setText("Testando..." if testing else "Testar Variável")
+        self.cancel_test_btn.setVisible(testing)
+
+    def set_response(self, response: str):
+        """
+        Exibe o corpo da resposta: no JSONTextEdit se for pequeno, ou no
+        LargeTextView (paginado, sem validação nem realce) acima de
+        LARGE_RESPONSE_CHARS. O LargeTextView só é escondido ao exibir uma
+        resposta pequena, para reaproveitar seu buffer se a mesma resposta
+        grande voltar a ser exibida.
+        """
+        response = response or ""
+        large = len(response) > LARGE_RESPONSE_CHARS
+        if large:
+            self.response_te.clear()
+            self.response_view.setPlainText(response)
+        else:
+            self.response_te.setPlainText(response)
+        self.response_te.setVisible(not large)
+        self.response_view.setVisible(large)
 
     def _update_body_editor_visibility(self):
         is_json = self.content_type_cb.currentText() == "application/json"
@@ -106,7 +150,7 @@ class HttpEditor(QWidget):
         self.body_form_table.setVisible(not is_json)
         self._emit_config_changed()
 
-    def show(self, *, method, url, params, headers, body, body_params, response, extract_path, content_type):
+    def show(self, *, method, url, params, headers, body, body_params, response, extract_path, content_type, cache_ttl=None):
         """
         Popula cada widget com os valores recebidos.
         """
@@ -141,8 +185,9 @@ class HttpEditor(QWidget):
             self.body_form_table.setItem(r, 2, QTableWidgetItem(v))
 
         self.body_te.setPlainText(body or "")
-        self.response_te.setPlainText(response or "")
+        self.set_response(response)
         self.extract_le.setText(extract_path or "")
+        self.cache_ttl_le.setText("" if cache_ttl is None else str(cache_ttl))
         super().show()
 
     def _emit_config_changed(self):
@@ -153,7 +198,8 @@ class HttpEditor(QWidget):
             "url": self.url_le.text().strip(),
             "params": self._collect_table(self.params_table),
             "headers": self._collect_table(self.headers_table),
-            "extract_path": self.extract_le.text().strip()
+            "extract_path": self.extract_le.text().strip(),
+            "cache_ttl": self._cache_ttl()
         }
         if cfg["content_type"] == "application/x-www-form-urlencoded":
             cfg["body_params"] = self._collect_table(self.body_form_table)
@@ -164,6 +210,15 @@ class HttpEditor(QWidget):
             cfg["body_params"] = {}
         self.configChanged.emit(cfg)
 
+    def _cache_ttl(self) -> int | None:
+        # o validador aceita estados intermediários como "+" durante a digitação
+        if not self.cache_ttl_le.hasAcceptableInput():
+            return None
+        try:
+            return int(self.cache_ttl_le.text())
+        except ValueError:
+            return None
+
     def _collect_table(self, table: ParameterTableWidget) -> dict:
         result = {}
         for row in range(table.rowCount()):
@@ -21,6 +21,7 @@ class EnvironmentWidget(QWidget):
     variableAdded          = pyqtSignal(object)
     variableRemoved        = pyqtSignal(int)
     variableTested         = pyqtSignal(int)
+    variableTestCancelled  = pyqtSignal(int)
     splitterMoved          = pyqtSignal(str, list)
     splitDirectionToggled  = pyqtSignal(str)
 
@@ -155,6 +156,9 @@ class EnvironmentWidget(QWidget):
         self.http_editor.test_btn.clicked.connect(
             lambda: self.variableTested.emit(self.table.currentRow())
         )
+        self.http_editor.testCancelled.connect(
+            lambda: self.variableTestCancelled.emit(self.table.currentRow())
+        )
         self.splitter.splitterMoved.connect(
             lambda pos, idx: self.splitterMoved.emit(
                 "horizontal" if self.splitter.orientation()==Qt.Horizontal else "vertical",
@@ -210,7 +214,8 @@ class EnvironmentWidget(QWidget):
                     body_params=var.body_params,
                     response=var.response,
                     extract_path=var.extract_path,
-                    content_type=var.content_type
+                    content_type=var.content_type,
+                    cache_ttl=var.cache_ttl
                 )
         except Exception as e:
             logger.error(f"Erro ao exibir variável '{var.name}': {e}")
@@ -0,0 +1,296 @@
+import re
+from bisect import bisect_left
+from typing import NamedTuple
+
+from PyQt5.QtGui import QColor, QFont, QSyntaxHighlighter, QTextBlock, QTextBlockUserData, QTextCharFormat
+
+BRACKET_PAIRS = {'(': ')', '[': ']', '{': '}'}
+_OPENERS = {close: open_ for open_, close in BRACKET_PAIRS.items()}
+
+# estado de bloco (QTextBlock.userState): o bloco termina dentro de uma string
+IN_STRING = 1
+
+# documentos maiores (em caracteres) são indexados, mas não coloridos
+HIGHLIGHT_MAX_CHARS = 500_000
+# desligado, o realce só volta abaixo desta fração do limite (histerese)
+HIGHLIGHT_RESUME_RATIO = 0.8
+
+_COLORS = {
+    "key": "#9cdcfe",
+    "string": "#ce9178",
+    "number": "#b5cea8",
+    "literal": "#569cd6",
+    "placeholder": "#c586c0",
+}
+
+
+def _formats() -> dict[str, QTextCharFormat]:
+    formats = {}
+    for kind, color in _COLORS.items():
+        fmt = QTextCharFormat()
+        fmt.setForeground(QColor(color))
+        if kind == "placeholder":
+            fmt.setFontWeight(QFont.Bold)
+        formats[kind] = fmt
+    return formats
+
+
+class JsonBlockData(QTextBlockUserData):
+    """
+    Tokens de um bloco, calculados pelo JsonBlockIndex.
+
+    `quotes` são as posições (no bloco) das aspas que abrem ou fecham
+    strings; `brackets`, pares (posição, caractere) dos delimitadores fora de
+    strings. `depth[abre]` resume o bloco para aquele tipo de delimitador:
+    (saldo, menor saldo parcial da esquerda, maior saldo parcial da direita),
+    o que permite pular blocos inteiros ao procurar o par de um delimitador.
+    `fold_opener` é a posição do primeiro `{`/`[` do bloco que não fecha na
+    mesma linha (início de uma região dobrável), e `folded` indica se essa
+    região está recolhida.
+    """
+    def __init__(self, starts_in_string: bool, quotes: list[int], brackets: list[tuple[int, str]]):
+        super().__init__()
+        self.starts_in_string = starts_in_string
+        self.quotes = quotes
+        self.brackets = brackets
+        self.depth: dict[str, tuple[int, int, int]] = {}
+        self.folded = False
+        open_stack = []
+        for offset, ch in brackets:
+            if ch in "{[":
+                open_stack.append((offset, ch))
+            elif open_stack and ch in "}]" and open_stack[-1][1] == _OPENERS[ch]:
+                open_stack.pop()
+        self.fold_opener = open_stack[0][0] if open_stack else None
+        for open_, close in BRACKET_PAIRS.items():
+            steps = [1 if ch == open_ else -1 for _, ch in brackets if ch in (open_, close)]
+            if not steps:
+                continue
+            running = lowest = 0
+            for step in steps:
+                running += step
+                lowest = min(lowest, running)
+            suffix = highest = 0
+            for step in reversed(steps):
+                suffix += step
+                highest = max(highest, suffix)
+            self.depth[open_] = (running, lowest, highest)
+
+    def in_string(self, offset: int) -> bool:
+        """True se a posição `offset` do bloco estiver dentro de uma string."""
+        return self.starts_in_string ^ (bisect_left(self.quotes, offset) % 2 == 1)
+
+
+_TOKEN_RE = re.compile(r"""
+    (?P<string>"(?:[^"\\]|\\.)*(?P<close>")?(?P<key>\s*:)?)
+  | (?P<placeholder>\{\{[^{}]*\}\})
+  | (?P<number>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+  | (?P<literal>\b(?:true|false|null)\b)
+  | (?P<bracket>[\[\](){}])
+""", re.VERBOSE)
+# continuação de uma string aberta em bloco anterior
+_STRING_TAIL_RE = re.compile(r'(?:[^"\\]|\\.)*(?P<close>")?')
+_PLACEHOLDER_RE = re.compile(r"\{\{[^{}]*\}\}")
+
+
+class BlockTokens(NamedTuple):
+    quotes: list[int]
+    brackets: list[tuple[int, str]]
+    spans: list[tuple[int, int, str]]   # (início, tamanho, tipo) para realce
+    in_string: bool
+
+
+def _string_spans(text: str, start: int, end: int, kind: str, spans: list):
+    spans.append((start, end - start, kind))
+    for m in _PLACEHOLDER_RE.finditer(text, start, end):
+        spans.append((m.start(), m.end() - m.start(), "placeholder"))
+
+
+def lex_block(text: str, in_string: bool) -> BlockTokens:
+    """
+    Tokens de uma linha: aspas, delimitadores fora de strings, trechos a
+    realçar e se a linha termina dentro de uma string.
+    """
+    quotes, brackets, spans = [], [], []
+    pos = 0
+    if in_string:
+        m = _STRING_TAIL_RE.match(text)
+        _string_spans(text, 0, m.end(), "string", spans)
+        if m.group("close") is None:
+            return BlockTokens(quotes, brackets, spans, True)
+        quotes.append(m.start("close"))
+        pos = m.end()
+    for m in _TOKEN_RE.finditer(text, pos):
+        kind = m.lastgroup
+        if m.group("string") is not None:
+            quotes.append(m.start())
+            if m.group("close") is None:
+                _string_spans(text, m.start(), m.end(), "string", spans)
+                return BlockTokens(quotes, brackets, spans, True)
+            quotes.append(m.start("close"))
+            _string_spans(text, m.start(), m.end("close"),
+                          "key" if m.group("key") else "string", spans)
+        elif kind == "bracket":
+            brackets.append((m.start(), m.group()))
+        else:
+            spans.append((m.start(), m.end() - m.start(), kind))
+    return BlockTokens(quotes, brackets, spans, False)
+
+
+def block_data(block: QTextBlock) -> JsonBlockData | None:
+    data = block.userData()
+    return data if isinstance(data, JsonBlockData) else None
+
+
+class JsonBlockIndex(QSyntaxHighlighter):
+    """
+    Índice incremental de tokens JSON por bloco, que também faz o realce.
+
+    Usa o mecanismo do QSyntaxHighlighter: após uma edição só os blocos
+    alterados são reprocessados, e a reanálise segue para os seguintes apenas
+    enquanto o estado de saída (dentro ou fora de string) mudar. Cada bloco
+    guarda um JsonBlockData, então verificar se uma posição está numa string
+    e achar o par de um delimitador não exigem reler o documento.
+
+    Chaves, strings, números, literais e `{{placeholders}}` são coloridos
+    enquanto o documento tiver até `highlight_max_chars` caracteres; acima
+    disso o índice continua sendo mantido, sem formatos, e o realce só volta
+    quando o documento cai abaixo de HIGHLIGHT_RESUME_RATIO do limite, para
+    que edições perto do limite não reprocessem o documento a cada tecla.
+    """
+    def __init__(self, document, highlight_max_chars: int = HIGHLIGHT_MAX_CHARS):
+        super().__init__(document)
+        self.highlight_max_chars = highlight_max_chars
+        self._formats = _formats()
+        # uma edição removeu o `{`/`[` de uma região recolhida ou alterou a
+        # linha que a fecha
+        self.lost_folds = False
+        self._highlighting = True
+        self._lexed_blocks = 0
+
+    def highlightBlock(self, text: str):
+        in_string = self.previousBlockState() == IN_STRING
+        tokens = lex_block(text, in_string)
+        data = JsonBlockData(in_string, tokens.quotes, tokens.brackets)
+        previous = self.currentBlockUserData()
+        if isinstance(previous, JsonBlockData):
+            if previous.folded:
+                if data.fold_opener is not None:
+                    data.folded = True
+                else:
+                    self.lost_folds = True
+            elif ([c for _, c in previous.brackets] != [c for _, c in data.brackets]
+                  and not self.currentBlock().previous().isVisible()):
+                # a linha que fecha uma região recolhida mudou
+                self.lost_folds = True
+        self.setCurrentBlockUserData(data)
+        self.setCurrentBlockState(IN_STRING if tokens.in_string else 0)
+        self._lexed_blocks += 1
+        if self._wants_highlighting():
+            for start, length, kind in tokens.spans:
+                self.setFormat(start, length, self._formats[kind])
+
+    def _wants_highlighting(self) -> bool:
+        limit = self.highlight_max_chars
+        if not self._highlighting:
+            limit *= HIGHLIGHT_RESUME_RATIO
+        return self.document().characterCount() <= limit
+
+    def update_highlighting(self):
+        """
+        Chamado após edições: se o documento cruzou o limite, reprocessa-o uma
+        vez para aplicar ou limpar as cores dos blocos que não foram
+        editados. Se a edição já reprocessou todos os blocos (como em
+        `setPlainText`), eles já têm o formato certo e nada é refeito.
+        """
+        lexed, self._lexed_blocks = self._lexed_blocks, 0
+        enabled = self._wants_highlighting()
+        if enabled == self._highlighting:
+            return
+        self._highlighting = enabled
+        if lexed < self.document().blockCount():
+            self.rehighlight()
+        self._lexed_blocks = 0
+
+    def is_inside_string(self, pos: int) -> bool:
+        block = self.document().findBlock(pos)
+        data = block_data(block)
+        return data is not None and data.in_string(pos - block.position())
+
+    def find_matching(self, pos: int) -> int | None:
+        """
+        Posição do delimitador que casa com o da posição `pos` (do mesmo
+        tipo e fora de strings), ou None.
+        """
+        block = self.document().findBlock(pos)
+        data = block_data(block)
+        if data is None:
+            return None
+        offset = pos - block.position()
+        ch = next((c for o, c in data.brackets if o == offset), None)
+        if ch is None:
+            return None
+        if ch in BRACKET_PAIRS:
+            return self._match_forward(block, data, offset, ch)
+        return self._match_backward(block, data, offset, _OPENERS[ch])
+
+    def fold_end(self, block: QTextBlock) -> QTextBlock | None:
+        """Bloco que fecha a região dobrável iniciada em `block`, ou None."""
+        data = block_data(block)
+        if data is None or data.fold_opener is None:
+            return None
+        match = self.find_matching(block.position() + data.fold_opener)
+        if match is None:
+            return None
+        end = self.document().findBlock(match)
+        return end if end.blockNumber() > block.blockNumber() else None
+
+    @staticmethod
+    def _match_forward(block: QTextBlock, data: JsonBlockData, offset: int, open_: str) -> int | None:
+        close, need = BRACKET_PAIRS[open_], 1
+        brackets = [b for b in data.brackets if b[0] > offset]
+        while True:
+            for o, c in brackets:
+                if c == open_:
+                    need += 1
+                elif c == close:
+                    need -= 1
+                    if need == 0:
+                        return block.position() + o
+            block = block.next()
+            if not block.isValid():
+                return None
+            data = block_data(block)
+            summary = data.depth.get(open_) if data else None
+            if summary is None:
+                brackets = []
+            elif need + summary[1] > 0:
+                need += summary[0]        # o par não está neste bloco
+                brackets = []
+            else:
+                brackets = data.brackets
+
+    @staticmethod
+    def _match_backward(block: QTextBlock, data: JsonBlockData, offset: int, open_: str) -> int | None:
+        close, need = BRACKET_PAIRS[open_], 1
+        brackets = [b for b in data.brackets if b[0] < offset]
+        while True:
+            for o, c in reversed(brackets):
+                if c == close:
+                    need += 1
+                elif c == open_:
+                    need -= 1
+                    if need == 0:
+                        return block.position() + o
+            block = block.previous()
+            if not block.isValid():
+                return None
+            data = block_data(block)
+            summary = data.depth.get(open_) if data else None
+            if summary is None:
+                brackets = []
+            elif need - summary[2] > 0:
+                need -= summary[0]
+                brackets = []
+            else:
+                brackets = data.brackets
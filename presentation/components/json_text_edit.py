@@ -1,9 +1,22 @@
-import json
+import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
 from PyQt5.QtGui import QTextCursor, QTextCharFormat, QColor, QTextFormat, QPainter
-from PyQt5.QtCore import Qt, QSize, QRect, pyqtSignal, QPoint
+from PyQt5.QtCore import Qt, QSize, QRect, pyqtSignal, QPoint, QTimer
 from PyQt5.QtWidgets import QWidget, QPlainTextEdit, QLabel, QTextEdit
 
+from presentation.components.json_block_index import BRACKET_PAIRS, HIGHLIGHT_MAX_CHARS, JsonBlockIndex, block_data
+from utils.json_check import JsonIssue, json_issue
+
+logger = logging.getLogger("JSONTextEdit")
+
+VALIDATION_DELAY_MS = 300
+FULL_VALIDATION_DELAY_MS = 1500
+# acima disso, a validação durante a digitação é só estrutural
+LARGE_DOCUMENT_CHARS = 200_000
+# coluna dos marcadores de dobra na área de numeração
+FOLD_MARKER_WIDTH = 14
+
 class LineNumberArea(QWidget):
     def __init__(self, editor):
         super().__init__(editor)
@@ -15,18 +28,44 @@ class LineNumberArea(QWidget):
     def paintEvent(self, event):
         self.editor.lineNumberAreaPaintEvent(event)
 
+    def mousePressEvent(self, event):
+        self.editor.lineNumberAreaMousePressEvent(event)
+
 
 class JSONTextEdit(QPlainTextEdit):
+    """
+    Editor de JSON com numeração de linhas, sugestão inline e validação.
+
+    A validação roda numa thread de fundo depois de VALIDATION_DELAY_MS sem
+    edições, sobre uma cópia do texto marcada com o número de revisão;
+    resultados de revisões antigas são descartados. Em documentos maiores
+    que LARGE_DOCUMENT_CHARS a verificação durante a digitação é só
+    estrutural (`structural_issue`) e o parse completo fica para depois de
+    FULL_VALIDATION_DELAY_MS ocioso ou da perda de foco.
+
+    Detecção de strings e casamento de delimitadores consultam o
+    `block_index` (JsonBlockIndex), atualizado só nos blocos editados, que
+    também faz o realce de sintaxe até `highlight_max_chars` caracteres.
+    Objetos e arrays de várias linhas podem ser recolhidos pelo marcador na
+    área de numeração: os blocos internos ficam invisíveis e o layout os
+    ignora. A região é achada pelo índice (`fold_end`) ao clicar.
+    """
     jsonValidityChanged = pyqtSignal(bool)
-    BRACKET_PAIRS = {'(': ')', '[': ']', '{': '}'}
+    validationReady = pyqtSignal(int, bool, object)
+    BRACKET_PAIRS = BRACKET_PAIRS
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, highlight_max_chars: int = HIGHLIGHT_MAX_CHARS):
         super().__init__(parent)
         self.suggestionProvider = None
+        self._error_selections: list[QTextEdit.ExtraSelection] = []
+        self.block_index = JsonBlockIndex(self.document(), highlight_max_chars)
+        self.textChanged.connect(self.block_index.update_highlighting)
+        self.textChanged.connect(self._check_lost_folds)
 
         self.lineNumberArea = LineNumberArea(self)
         self.blockCountChanged.connect(self.updateLineNumberAreaWidth)
         self.updateRequest.connect(self.updateLineNumberArea)
+        self.cursorPositionChanged.connect(self._reveal_cursor)
         self.cursorPositionChanged.connect(self.highlightCurrentLine)
         self.updateLineNumberAreaWidth(0)
         self.highlightCurrentLine()
@@ -39,11 +78,21 @@ class JSONTextEdit(QPlainTextEdit):
         self.textChanged.connect(self._updateSuggestion)
 
         self._last_valid_state = None
+        self._revision = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="json-validation")
+        self._validation_timer = QTimer(self)
+        self._validation_timer.setSingleShot(True)
+        self._validation_timer.timeout.connect(self._start_validation)
+        self._full_validation_timer = QTimer(self)
+        self._full_validation_timer.setSingleShot(True)
+        self._full_validation_timer.timeout.connect(lambda: self._start_validation(full=True))
+        self.textChanged.connect(self._schedule_validation)
+        self.validationReady.connect(self._on_validation_ready)
+        self.destroyed.connect(self._release)
         self.jsonValidityChanged.connect(self._on_json_validity_changed)
         self.validate_json()
 
     def _updateSuggestion(self):
-        self.validate_json()
         if callable(self.suggestionProvider):
             tc = self.textCursor()
             tc.select(QTextCursor.WordUnderCursor)
@@ -97,6 +146,7 @@ class JSONTextEdit(QPlainTextEdit):
             new_cursor.setPosition(pos)
             self.setTextCursor(new_cursor)
             self.blockSignals(False)
+            self._schedule_validation()
             self._updateSuggestion()
             return
 
@@ -135,7 +185,7 @@ class JSONTextEdit(QPlainTextEdit):
         return tc.selectedText()
 
     def handleTextChanged(self):
-        self.validate_json()
+        self._schedule_validation()
 
     def _on_json_validity_changed(self, valid: bool):
         if not valid:
@@ -144,35 +194,75 @@ class JSONTextEdit(QPlainTextEdit):
         else:
             self.notification_label.hide()
 
-    def validate_json(self):
+    def _release(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _schedule_validation(self):
+        self._revision += 1
+        self._full_validation_timer.stop()
+        self._validation_timer.start(VALIDATION_DELAY_MS)
+
+    def _start_validation(self, full: bool | None = None):
         text = self.toPlainText()
-        self.setExtraSelections([])
-        valid, tip = True, ""
-        if text.strip():
-            try:
-                json.loads(text)
-            except json.JSONDecodeError as e:
-                valid = False
-                block = self.document().findBlockByNumber(e.lineno - 1)
-                if block.isValid():
-                    pos = block.position() + e.colno - 1
-                    c = QTextCursor(self.document())
-                    c.setPosition(pos)
-                    c.movePosition(QTextCursor.NextCharacter, QTextCursor.KeepAnchor)
-                    fmt = QTextCharFormat()
-                    fmt.setUnderlineColor(QColor("red"))
-                    fmt.setUnderlineStyle(QTextCharFormat.SpellCheckUnderline)
-                    sel = QTextEdit.ExtraSelection()
-                    sel.cursor, sel.format = c, fmt
-                    self.setExtraSelections([sel])
-                tip = f"JSON inválido: {e.msg}"
+        if full is None:
+            full = len(text) <= LARGE_DOCUMENT_CHARS
+        self._executor.submit(self._validate_snapshot, self._revision, text, full)
+
+    def _validate_snapshot(self, revision: int, text: str, full: bool):
+        if revision != self._revision:
+            return
+        try:
+            issue = json_issue(text, full)
+        except Exception as e:
+            logger.error(f"[JSONTextEdit] erro ao validar JSON: {e}")
+            return
+        try:
+            self.validationReady.emit(revision, full, issue)
+        except RuntimeError:
+            pass  # widget já destruído
+
+    def _on_validation_ready(self, revision: int, full: bool, issue: JsonIssue | None):
+        if revision != self._revision:
+            return
+        self._apply_issue(issue)
+        if not full and issue is None:
+            self._full_validation_timer.start(FULL_VALIDATION_DELAY_MS)
+
+    def validate_json(self):
+        """Valida o texto atual imediatamente, descartando validações pendentes."""
+        self._validation_timer.stop()
+        self._full_validation_timer.stop()
+        self._revision += 1
+        self._apply_issue(json_issue(self.toPlainText()))
+
+    def _apply_issue(self, issue: JsonIssue | None):
+        self._error_selections = []
+        tip = ""
+        if issue is not None:
+            block = self.document().findBlockByNumber(issue.line - 1)
+            if block.isValid():
+                pos = min(block.position() + issue.column - 1, self.document().characterCount() - 1)
+                c = QTextCursor(self.document())
+                c.setPosition(pos)
+                c.movePosition(QTextCursor.NextCharacter, QTextCursor.KeepAnchor)
+                fmt = QTextCharFormat()
+                fmt.setUnderlineColor(QColor("red"))
+                fmt.setUnderlineStyle(QTextCharFormat.SpellCheckUnderline)
+                sel = QTextEdit.ExtraSelection()
+                sel.cursor, sel.format = c, fmt
+                self._error_selections.append(sel)
+            tip = f"JSON inválido: {issue.message}"
+        self.highlightCurrentLine()
         self.setToolTip(tip)
+        valid = issue is None
         if self._last_valid_state is None or self._last_valid_state != valid:
             self._last_valid_state = valid
             self.jsonValidityChanged.emit(valid)
 
     def focusOutEvent(self, event):
-        self.validate_json()
+        self._validation_timer.stop()
+        self._full_validation_timer.stop()
+        self._start_validation(full=True)
         super().focusOutEvent(event)
 
     def resizeEvent(self, event):
@@ -187,7 +277,7 @@ class JSONTextEdit(QPlainTextEdit):
 
     def lineNumberAreaWidth(self):
         digits = len(str(self.blockCount()))
-        return 10 + self.fontMetrics().width('9') * digits + 20
+        return 10 + self.fontMetrics().width('9') * digits + 20 + FOLD_MARKER_WIDTH
 
     def updateLineNumberAreaWidth(self, _):
         self.setViewportMargins(self.lineNumberAreaWidth(), 0, 0, 0)
@@ -208,18 +298,131 @@ class JSONTextEdit(QPlainTextEdit):
         top = int(self.blockBoundingGeometry(block)
                   .translated(self.contentOffset()).top())
         bottom = top + int(self.blockBoundingRect(block).height())
-        num = block.blockNumber()
+        height = self.fontMetrics().height()
         while block.isValid() and top <= event.rect().bottom():
             if block.isVisible() and bottom >= event.rect().top():
                 painter.setPen(Qt.white)
-                painter.drawText(0, top, self.lineNumberArea.width(),
-                                 self.fontMetrics().height(),
-                                 Qt.AlignHCenter|Qt.AlignVCenter,
-                                 str(num+1))
-            block = block.next()
+                painter.drawText(0, top, self.lineNumberArea.width() - FOLD_MARKER_WIDTH,
+                                 height, Qt.AlignHCenter|Qt.AlignVCenter,
+                                 str(block.blockNumber()+1))
+                data = block_data(block)
+                if data is not None and data.fold_opener is not None:
+                    painter.setPen(QColor(150, 150, 150))
+                    painter.drawText(self.lineNumberArea.width() - FOLD_MARKER_WIDTH, top,
+                                     FOLD_MARKER_WIDTH, height, Qt.AlignCenter,
+                                     "▸" if data.folded else "▾")
+            block = self._next_visible(block)
             top = bottom
             bottom = top + int(self.blockBoundingRect(block).height())
-            num += 1
+
+    @staticmethod
+    def _next_visible(block):
+        block = block.next()
+        while block.isValid() and not block.isVisible():
+            block = block.next()
+        return block
+
+    def lineNumberAreaMousePressEvent(self, event):
+        if event.button() != Qt.LeftButton:
+            return
+        if event.pos().x() < self.lineNumberArea.width() - FOLD_MARKER_WIDTH:
+            return  # clique nos números, fora da coluna dos marcadores
+        block = self.firstVisibleBlock()
+        top = self.blockBoundingGeometry(block).translated(self.contentOffset()).top()
+        while block.isValid() and top <= event.pos().y():
+            bottom = top + self.blockBoundingRect(block).height()
+            if event.pos().y() < bottom:
+                self.toggle_fold(block)
+                return
+            block = self._next_visible(block)
+            top = bottom
+
+    # ---- dobra ------------------------------------------------------------
+
+    def toggle_fold(self, block):
+        """Recolhe ou expande a região dobrável iniciada em `block`."""
+        data = block_data(block)
+        if data is not None and data.folded:
+            self._unfold(block, data)
+            return
+        if data is None or data.fold_opener is None:
+            return
+        end = self.block_index.fold_end(block)
+        if end is None:
+            return
+        data.folded = True
+        inner = block.next()
+        while inner.isValid() and inner.blockNumber() < end.blockNumber():
+            inner.setVisible(False)
+            inner_data = block_data(inner)
+            if inner_data is not None:
+                inner_data.folded = False
+            inner = inner.next()
+        self._relayout(block, end)
+        if not self.textCursor().block().isVisible():
+            cursor = self.textCursor()
+            cursor.setPosition(block.position() + data.fold_opener + 1)
+            self.setTextCursor(cursor)
+
+    def _unfold(self, block, data):
+        """
+        Mostra os blocos ocultos após `block` até o próximo visível. Não
+        depende do par do delimitador, que pode ter sido editado ou apagado
+        enquanto a região estava recolhida.
+        """
+        data.folded = False
+        last = block
+        inner = block.next()
+        while inner.isValid() and not inner.isVisible():
+            inner.setVisible(True)
+            inner_data = block_data(inner)
+            if inner_data is not None:
+                inner_data.folded = False
+            last = inner
+            inner = inner.next()
+        self._relayout(block, last)
+
+    def unfold_all(self):
+        block = self.document().firstBlock()
+        first, last = None, None
+        while block.isValid():
+            data = block_data(block)
+            changed = data is not None and data.folded or not block.isVisible()
+            if data is not None:
+                data.folded = False
+            if changed:
+                block.setVisible(True)
+                first = block if first is None else first
+                last = block
+            block = block.next()
+        self.block_index.lost_folds = False
+        if first is not None and last is not None:
+            self._relayout(first, last)
+
+    def _relayout(self, first, last):
+        self.document().markContentsDirty(first.position(),
+                                          last.position() + last.length() - first.position())
+        self.viewport().update()
+        self.lineNumberArea.update()
+
+    def _reveal_cursor(self):
+        """Expande a região recolhida que contém o cursor."""
+        block = self.textCursor().block()
+        if block.isVisible():
+            return
+        start = block.previous()
+        while start.isValid() and not start.isVisible():
+            start = start.previous()
+        if start.isValid():
+            data = block_data(start)
+            if data is not None:
+                self._unfold(start, data)
+                return
+        self.unfold_all()
+
+    def _check_lost_folds(self):
+        if self.block_index.lost_folds:
+            self.unfold_all()
 
     def highlightCurrentLine(self):
         sels = []
@@ -233,67 +436,34 @@ class JSONTextEdit(QPlainTextEdit):
         brace = self._bracket_highlight()
         if brace:
             sels.extend(brace)
-        self.setExtraSelections(sels)
+        self.setExtraSelections(sels + self._error_selections)
 
     def _bracket_highlight(self):
-        text = self.toPlainText()
         pos = self.textCursor().position()
         for idx in (pos-1, pos):
-            if 0 <= idx < len(text):
-                ch = text[idx]
-                if ch in self.BRACKET_PAIRS or ch in self.BRACKET_PAIRS.values():
-                    match = self._find_matching(text, idx, ch)
-                    if match is not None:
-                        out = []
-                        for p in (idx, match):
-                            c = QTextCursor(self.document())
-                            c.setPosition(p)
-                            c.movePosition(QTextCursor.NextCharacter,
-                                           QTextCursor.KeepAnchor)
-                            fmt = QTextCharFormat()
-                            fmt.setBackground(QColor('orange'))
-                            sel = QTextEdit.ExtraSelection()
-                            sel.cursor, sel.format = c, fmt
-                            out.append(sel)
-                        return out
-        return None
-
-    def _find_matching(self, text, index, ch):
-        opens = '([{'
-        closes = ')]}'
-        pairs = self.BRACKET_PAIRS
-        rev = {v: k for k, v in pairs.items()}
-        if ch in opens:
-            stack, match = 1, pairs[ch]
-            for i in range(index+1, len(text)):
-                if text[i] == ch: stack += 1
-                if text[i] == match: stack -= 1
-                if stack == 0: return i
-        elif ch in closes:
-            stack, open_ch = 1, rev[ch]
-            for i in range(index-1, -1, -1):
-                if text[i] == ch: stack += 1
-                if text[i] == open_ch: stack -= 1
-                if stack == 0: return i
+            if idx < 0:
+                continue
+            match = self.block_index.find_matching(idx)
+            if match is not None:
+                out = []
+                for p in (idx, match):
+                    c = QTextCursor(self.document())
+                    c.setPosition(p)
+                    c.movePosition(QTextCursor.NextCharacter,
+                                   QTextCursor.KeepAnchor)
+                    fmt = QTextCharFormat()
+                    fmt.setBackground(QColor('orange'))
+                    sel = QTextEdit.ExtraSelection()
+                    sel.cursor, sel.format = c, fmt
+                    out.append(sel)
+                return out
         return None
 
     def _is_inside_string(self, pos=None) -> bool:
         """
         Retorna True se a posição estiver dentro de um literal de string JSON.
-        Conta aspas não-escapadas até pos.
+        Consulta o índice por bloco (JsonBlockIndex) em vez de reler o texto.
         """
         if pos is None:
             pos = self.textCursor().position()
-        txt = self.toPlainText()[:pos]
-        count = 0
-        escaped = False
-        for ch in txt:
-            if ch == '\\' and not escaped:
-                escaped = True
-                continue
-            if ch == '"' and not escaped:
-                count += 1
-            escaped = False
-        return (count % 2) == 1
-
-
+        return self.block_index.is_inside_string(pos)
@@ -0,0 +1,182 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import Qt, QRect, pyqtSignal
+from PyQt5.QtGui import QColor, QFontDatabase, QKeySequence, QPainter
+from PyQt5.QtWidgets import QAbstractScrollArea, QApplication, QLabel, QVBoxLayout, QWidget
+
+from utils.line_buffer import LineBuffer
+
+logger = logging.getLogger("LargeTextView")
+
+def _format_size(size: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class _RowsView(QAbstractScrollArea):
+    """
+    Área de rolagem que desenha só as rows visíveis de um LineBuffer.
+    Nada do texto fica no widget: cada paintEvent lê do buffer as rows da
+    janela atual. Ctrl+C copia as rows visíveis.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.buffer: LineBuffer | None = None
+        self.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.setFocusPolicy(Qt.StrongFocus)
+        self._max_width = 0
+
+    def set_buffer(self, buffer: LineBuffer | None):
+        self.buffer = buffer
+        self._max_width = 0
+        self.verticalScrollBar().setValue(0)
+        self.horizontalScrollBar().setValue(0)
+        self._update_scrollbars()
+        self.viewport().update()
+
+    def _row_height(self) -> int:
+        return self.fontMetrics().lineSpacing()
+
+    def _visible_rows(self) -> int:
+        return max(1, self.viewport().height() // self._row_height())
+
+    def _gutter_width(self) -> int:
+        lines = self.buffer.line_count if self.buffer else 1
+        return 10 + self.fontMetrics().width("9") * len(str(lines)) + 10
+
+    def _update_scrollbars(self):
+        rows = self.buffer.row_count if self.buffer else 0
+        page = self._visible_rows()
+        vbar = self.verticalScrollBar()
+        vbar.setRange(0, max(0, rows - page))
+        vbar.setPageStep(page)
+        hbar = self.horizontalScrollBar()
+        hbar.setRange(0, max(0, self._max_width - self.viewport().width() + self._gutter_width()))
+        hbar.setPageStep(self.viewport().width())
+        hbar.setSingleStep(self.fontMetrics().width("9") * 4)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scrollbars()
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        rect = self.viewport().rect()
+        gutter = self._gutter_width()
+        painter.fillRect(QRect(0, 0, gutter, rect.height()), QColor("#171717"))
+        if self.buffer is None:
+            return
+        fm = self.fontMetrics()
+        height = self._row_height()
+        first = self.verticalScrollBar().value()
+        x = gutter + 4 - self.horizontalScrollBar().value()
+        widest = self._max_width
+        y = 0
+        for offset, text in enumerate(self.buffer.rows(first, self._visible_rows() + 1)):
+            row = first + offset
+            if self.buffer.starts_line(row):
+                painter.setPen(Qt.white)
+                painter.drawText(0, y, gutter, height, Qt.AlignHCenter | Qt.AlignVCenter,
+                                 str(self.buffer.line_of(row) + 1))
+            painter.setPen(self.palette().text().color())
+            painter.setClipRect(QRect(gutter, 0, rect.width() - gutter, rect.height()))
+            painter.drawText(x, y + fm.ascent(), text)
+            painter.setClipping(False)
+            widest = max(widest, fm.width(text) + 8)
+            y += height
+        painter.end()
+        if widest != self._max_width:
+            self._max_width = widest
+            self._update_scrollbars()
+
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.Copy) and self.buffer is not None:
+            first = self.verticalScrollBar().value()
+            QApplication.clipboard().setText(self.buffer.text(first, self._visible_rows()))
+            return
+        super().keyPressEvent(event)
+
+
+class LargeTextView(QWidget):
+    """
+    Visualizador somente leitura para textos grandes (respostas HTTP).
+
+    O texto é copiado para um LineBuffer (arquivo temporário mapeado em
+    memória) e exibido em páginas conforme a rolagem, sem montar um
+    QTextDocument. O cabeçalho mostra tamanho e número de linhas.
+
+    O buffer é gravado e indexado numa thread de fundo e trocado quando fica
+    pronto; cada `setPlainText` recebe um número de geração e buffers de
+    gerações antigas são descartados. Enquanto o texto não muda, o buffer
+    atual (ou o que está sendo montado) é reaproveitado.
+    """
+    bufferReady = pyqtSignal(int, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.info_label = QLabel()
+        self.rows_view = _RowsView()
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.info_label)
+        layout.addWidget(self.rows_view)
+        self._buffer: LineBuffer | None = None
+        # texto do buffer exibido ou em construção
+        self._text: str | None = None
+        self._generation = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="large-text-buffer")
+        self.bufferReady.connect(self._on_buffer_ready)
+        self.destroyed.connect(self._release)
+
+    def setPlainText(self, text: str):
+        text = text or ""
+        if self._text is text or self._text == text:
+            return
+        self.clear()
+        self._text = text
+        self.info_label.setText(f"Carregando {len(text)} caracteres…")
+        self._executor.submit(self._build_buffer, self._generation, text)
+
+    def _build_buffer(self, generation: int, text: str):
+        if generation != self._generation:
+            return
+        try:
+            buffer = LineBuffer(text)
+        except Exception as e:
+            logger.error(f"Falha ao preparar o texto para exibição: {e}")
+            return
+        try:
+            self.bufferReady.emit(generation, buffer)
+        except RuntimeError:
+            buffer.close()  # widget já destruído
+
+    def _on_buffer_ready(self, generation: int, buffer: LineBuffer):
+        if generation != self._generation:
+            buffer.close()
+            return
+        self._buffer = buffer
+        self.info_label.setText(
+            f"{_format_size(buffer.size)} · {buffer.line_count} linhas "
+            f"(visualização paginada, somente leitura)"
+        )
+        self.rows_view.set_buffer(buffer)
+
+    def clear(self):
+        self._generation += 1
+        self._text = None
+        self.rows_view.set_buffer(None)
+        if self._buffer is not None:
+            self._buffer.close()
+            self._buffer = None
+        self.info_label.clear()
+
+    def _release(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def closeEvent(self, event):
+        self.clear()
+        super().closeEvent(event)
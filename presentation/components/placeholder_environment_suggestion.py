@@ -1,11 +1,28 @@
-import json
+import heapq
 import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import RLock
 
 from PyQt5.QtWidgets import QLineEdit, QPlainTextEdit, QCompleter
-from PyQt5.QtCore import Qt, QStringListModel
+from PyQt5.QtCore import Qt, QStringListModel, pyqtSignal
+from PyQt5.QtGui import QPainter
+
+from services.variable_repository import VariableRepository, VariableChange, ADDED, REMOVED, RESET
+from services.placeholder_usage import PlaceholderUsageStats
+from services.resolution_engine import extract, parse_response, to_text
+from services.response_key_index import ResponseKeyIndex
+from utils.fuzzy_match import FuzzyCandidate, make_candidate, segment_score, top_k
+from utils.prefix_index import PrefixIndex
+from utils.template import Reference, compile_template
 
 logger = logging.getLogger("PlaceholderEnvironmentSuggestion")
 
+_UNPARSED = object()
+# conteúdos até este tamanho são interpretados para a prévia na própria
+# thread da interface; os maiores, na thread de sugestões
+PREVIEW_SYNC_CHARS = 16 * 1024
+
 class CustomCompleter(QCompleter):
     """
     Subclasse QCompleter para desativar inserção automática de texto pelo Qt.
@@ -19,81 +36,411 @@ class CustomCompleter(QCompleter):
 class PlaceholderSuggestionProvider:
     """
     Fornece sugestões de placeholders do tipo VAR.prop...VAR.prop.subprop.
-    Usa VariableService para carregar dados JSON de forma genérico.
+    Lê as variáveis do VariableRepository compartilhado e mantém, atualizados
+    pelos eventos do repositório:
+      - um PrefixIndex dos nomes, para completar o nome da variável sem
+        percorrer todas elas;
+      - o hash do conteúdo (`response` ou `value`) de cada variável, que
+        aponta para o ResponseKeyIndex persistente; o hash só é recalculado
+        quando esses campos mudam.
+    Os eventos chegam pela thread da interface e as sugestões são
+    calculadas em outra thread, por isso esse estado fica sob `_lock`.
+
+    No modo "fuzzy" (padrão) as sugestões são casadas por subsequência,
+    segmento a segmento (`tok.acc` → `TOKEN.access_token`), e ordenadas por
+    pontuação com um heap limitado aos `max_results` melhores, somando o
+    bônus de frequência/recência dos placeholders inseridos (`record_usage`).
+    O modo "prefix" mantém o casamento por prefixo.
+
+    As respostas interpretadas para a prévia (`preview_value`) ficam num LRU
+    de até `max_parsed` variáveis.
     """
-    def __init__(self, variable_service):
-        self.variable_service = variable_service
+    def __init__(self,
+                 repository: VariableRepository,
+                 max_results: int = 50,
+                 key_index: ResponseKeyIndex | None = None,
+                 match_mode: str = "fuzzy",
+                 usage: PlaceholderUsageStats | None = None,
+                 max_name_matches: int = 20,
+                 max_parsed: int = 8):
+        self.repository = repository
+        self.max_results = max_results
+        self.key_index = key_index or ResponseKeyIndex()
+        self.match_mode = match_mode
+        self.usage = usage or PlaceholderUsageStats()
+        self.max_name_matches = max_name_matches
+        self.max_parsed = max_parsed
+        self._names = PrefixIndex()
+        self._by_name: dict[str, list] = {}
+        self._hashes: dict[int, str] = {}
+        self._parsed: "OrderedDict[int, object]" = OrderedDict()
+        self._name_candidates: list[FuzzyCandidate] | None = None
+        self._lock = RLock()
+        # incrementado a cada mudança de conteúdo; um hash calculado fora do
+        # lock só é gravado se nenhuma mudança tiver chegado nesse intervalo
+        self._epoch = 0
+        self._rebuild()
+        self._unsubscribe = repository.subscribe(self._on_variable_changed)
+
+    def _rebuild(self):
+        with self._lock:
+            self._by_name = {}
+            for var in self.repository.snapshot():
+                self._by_name.setdefault(var.name, []).append(var)
+            self._names.reset(v.name for v in self.repository.snapshot())
+            self._hashes.clear()
+            self._parsed.clear()
+            self._name_candidates = None
+            self._epoch += 1
+
+    def _index_var(self, var):
+        self._by_name.setdefault(var.name, []).append(var)
+        self._names.add(var.name)
+        self._name_candidates = None
+
+    def _unindex_var(self, var, name: str):
+        same = self._by_name.get(name, [])
+        for i, v in enumerate(same):
+            if v is var:
+                del same[i]
+                self._names.remove(name)
+                break
+        if not same:
+            self._by_name.pop(name, None)
+        self._name_candidates = None
+
+    def _on_variable_changed(self, change: VariableChange):
+        with self._lock:
+            if change.kind == RESET:
+                self._rebuild()
+            elif change.kind == ADDED:
+                self._index_var(change.variable)
+            elif change.kind == REMOVED:
+                self._unindex_var(change.variable, change.variable.name)
+                self._forget_content(change.variable)
+            elif change.field == "name":
+                self._unindex_var(change.variable, change.old_value)
+                self._index_var(change.variable)
+            elif change.field in ("response", "value"):
+                self._forget_content(change.variable)
+
+    def _forget_content(self, var):
+        self._hashes.pop(id(var), None)
+        self._parsed.pop(id(var), None)
+        self._epoch += 1
+
+    def _vars_named(self, name: str) -> list:
+        with self._lock:
+            return list(self._by_name.get(name, ()))
+
+    def _content_hash(self, var) -> str:
+        # `ensure` com o hash já conhecido só renova a posição no LRU; se o
+        # ResponseKeyIndex tiver descartado a entrada, ela é refeita a partir
+        # do texto lido aqui
+        key = id(var)
+        with self._lock:
+            known, epoch = self._hashes.get(key), self._epoch
+            text = var.response or var.value or ""
+        h = self.key_index.ensure(text, known)
+        with self._lock:
+            if epoch == self._epoch:
+                self._hashes[key] = h
+        return h
+
+    def needs_parse(self, ref: Reference) -> bool:
+        """
+        True se `preview_value(ref)` tiver de interpretar um conteúdo grande
+        que ainda não está no cache.
+        """
+        same = self._vars_named(ref.root)
+        if not same:
+            return False
+        var = same[0]
+        if not ref.expr and var.extracted_value is not None:
+            return False
+        with self._lock:
+            return (id(var) not in self._parsed
+                    and len(var.response or var.value or "") > PREVIEW_SYNC_CHARS)
+
+    def preview_value(self, ref: Reference) -> str | None:
+        """
+        Valor do placeholder segundo o último conteúdo conhecido da variável
+        (`response` ou `value`), sem ir à rede; None se não houver.
+        """
+        same = self._vars_named(ref.root)
+        if not same:
+            return None
+        var = same[0]
+        if not ref.expr and var.extracted_value is not None:
+            return to_text(var.extracted_value)
+        # `_parsed` só é invalidado quando `response`/`value` mudam; o dado
+        # pode ser None (resposta "null"), daí o sentinela
+        with self._lock:
+            data, epoch = self._parsed.get(id(var), _UNPARSED), self._epoch
+            if data is not _UNPARSED:
+                self._parsed.move_to_end(id(var))
+            text = var.response or var.value or ""
+        if data is _UNPARSED:
+            data = parse_response(text)
+            with self._lock:
+                if epoch == self._epoch:
+                    self._parsed[id(var)] = data
+                    while len(self._parsed) > self.max_parsed:
+                        self._parsed.popitem(last=False)
+        try:
+            return to_text(extract(var, data, ref.expr))
+        except (KeyError, ValueError):
+            return None
+
+    def close(self):
+        self._unsubscribe()
+        self.key_index.close()
+
+    def record_usage(self, placeholder: str):
+        """Registra um placeholder inserido, para o bônus de ranking."""
+        self.usage.record(placeholder)
 
     def suggestions(self, text_before_cursor: str) -> list[str]:
         raw = text_before_cursor.split('{{')[-1] if '{{' in text_before_cursor else text_before_cursor
         token = raw.strip()
         if not token:
             return []
+        if self.match_mode == "fuzzy":
+            return self._fuzzy_suggestions(token)
+        return self._prefix_suggestions(token)
 
+    def _names_for_fuzzy(self) -> list[FuzzyCandidate]:
+        with self._lock:
+            candidates = self._name_candidates
+            if candidates is None:
+                candidates = [make_candidate(n) for n in self._by_name]
+                self._name_candidates = candidates
+            return candidates
+
+    def _fuzzy_suggestions(self, token: str) -> list[str]:
+        parts = token.split('.')
+        boost = self.usage.boost
+        if len(parts) == 1:
+            return [t for _, t in top_k(token, self._names_for_fuzzy(), self.max_results, boost)]
+
+        # busca em feixe nível a nível: mantém só os `max_name_matches`
+        # melhores caminhos de cada nível, limitando o custo por tecla
+        beam = []
+        for name_score, name in top_k(parts[0], self._names_for_fuzzy(), self.max_name_matches):
+            for var in self._vars_named(name):
+                beam.append((name_score, name, self._content_hash(var), ()))
+
+        nested = parts[1:]
+        for level, query in enumerate(nested):
+            last = level == len(nested) - 1
+            width = self.max_results if last else self.max_name_matches
+            folded_query = query.casefold()
+
+            def expand(beam=beam, last=last, folded_query=folded_query):
+                for score, text, content_hash, path in beam:
+                    for key in self.key_index.child_keys(content_hash, list(path)) or ():
+                        s = segment_score(folded_query, key.casefold(), key)
+                        if s is None:
+                            continue
+                        child = f"{text}.{key}"
+                        yield score + s + (boost(child) if last else 0.0), child, content_hash, path + (key,)
+
+            beam = heapq.nlargest(width, expand(), key=lambda item: item[0])
+        return [item[1] for item in beam]
+
+    def _prefix_suggestions(self, token: str) -> list[str]:
         parts = token.split('.')
         var_prefix = parts[0]
         nested = parts[1:]
-        results: list[str] = []
+        limit = self.max_results
+
+        if not nested:
+            with self._lock:
+                return self._names.search(var_prefix, limit)
 
-        for var in self.variable_service.load_all():
-            if var.name.lower().startswith(var_prefix.lower()):
-                if not nested:
-                    results.append(var.name)
-                else:
-                    try:
-                        data = json.loads(var.response or var.value)
-                    except Exception:
-                        continue
-                    curr = data
-                    for key in nested[:-1]:
-                        if isinstance(curr, dict) and key in curr:
-                            curr = curr[key]
-                        else:
-                            curr = None
-                            break
-                    if not isinstance(curr, dict):
-                        continue
-                    last = nested[-1]
-                    for k in curr:
-                        if k.lower().startswith(last.lower()):
-                            path = ".".join(nested[:-1] + [k])
-                            results.append(f"{var.name}.{path}")
+        results: list[str] = []
+        with self._lock:
+            names = self._names.search(var_prefix)
+        for name in names:
+            for var in self._vars_named(name):
+                keys = self.key_index.child_keys(self._content_hash(var), nested[:-1])
+                if not keys:
+                    continue
+                last = nested[-1]
+                for k in keys:
+                    if k.lower().startswith(last.lower()):
+                        path = ".".join(nested[:-1] + [k])
+                        results.append(f"{var.name}.{path}")
+                        if limit is not None and len(results) >= limit:
+                            return results
         return results
 
 class PlaceholderLineEdit(QLineEdit):
     """
     QLineEdit com autocomplete de placeholders, preservando '{{' e '}}'.
     Usa CustomCompleter para desativar inserção automática do Qt e inserir manualmente.
+
+    As sugestões são calculadas numa thread de fundo: cada pedido recebe um
+    número de geração e resultados de gerações antigas são descartados.
+    Pedidos repetidos para o mesmo prefixo são coalescidos e o popup é
+    atualizado apenas com o resultado mais recente.
+
+    O texto é compilado com `compile_template` (cache por texto) a cada
+    edição; a mesma forma compilada localiza o placeholder sob o cursor e
+    gera a prévia do valor renderizado, desenhada em cinza após o texto.
+    Se a prévia exigir interpretar uma resposta grande ainda fora do cache
+    do provider, ela é calculada na thread de sugestões, também com número
+    de geração.
     """
+    suggestionsReady = pyqtSignal(int, str, list)
+    previewReady = pyqtSignal(int, str)
+
     def __init__(self, provider: PlaceholderSuggestionProvider, parent=None):
         super().__init__(parent)
         self.provider = provider
         self.model = QStringListModel()
         self.completer = CustomCompleter(self)
         self.completer.setCaseSensitivity(Qt.CaseInsensitive)
-        self.completer.setCompletionMode(QCompleter.PopupCompletion)
+        # a ordem do ranking do provider é preservada: o Qt não refiltra
+        self.completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
         self.completer.setModel(self.model)
         self.completer.setWidget(self)
         self.setCompleter(self.completer)
 
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="placeholder-suggestions")
+        self._generation = 0
+        self._pending_prefix = None
+        self._last_result: tuple[str, list[str]] | None = None
+        self._preview = ""
+        self._preview_generation = 0
+
         self.textEdited.connect(self._update_completer)
+        self.textChanged.connect(self._update_preview)
         self.completer.popup().clicked.connect(self._on_popup_clicked)
+        self.suggestionsReady.connect(self._on_suggestions_ready)
+        self.previewReady.connect(self._on_preview_ready)
+        self._unsubscribe = provider.repository.subscribe(self._invalidate_suggestions)
+        self.destroyed.connect(self._release)
+
+    def _invalidate_suggestions(self, _change=None):
+        self._last_result = None
+        self._pending_prefix = None
+        self._generation += 1
+        self._update_preview(self.text())
+
+    def _update_preview(self, text: str):
+        self._preview_generation += 1
+        template = compile_template(text)
+        if template.is_literal:
+            self._set_preview("")
+        elif any(self.provider.needs_parse(ref) for ref in template.references):
+            self._executor.submit(self._compute_preview, self._preview_generation, text)
+        else:
+            self._set_preview(self._render_preview(text))
+
+    def _render_preview(self, text: str) -> str:
+        def lookup(ref: Reference) -> str:
+            value = self.provider.preview_value(ref)
+            return value if value is not None else text[ref.start:ref.end]
+        return compile_template(text).render(lookup)
+
+    def _compute_preview(self, generation: int, text: str):
+        if generation != self._preview_generation:
+            return
+        try:
+            preview = self._render_preview(text)
+        except Exception as e:
+            logger.error(f"[PlaceholderLineEdit] erro ao calcular prévia: {e}")
+            return
+        try:
+            self.previewReady.emit(generation, preview)
+        except RuntimeError:
+            pass  # widget já destruído
+
+    def _on_preview_ready(self, generation: int, preview: str):
+        if generation == self._preview_generation:
+            self._set_preview(preview)
+
+    def _set_preview(self, preview: str):
+        if preview != self._preview:
+            self._preview = preview
+            self.setToolTip(preview)
+            self.update()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._preview or self.hasSelectedText():
+            return
+        margins = self.textMargins()
+        rect = self.contentsRect().adjusted(margins.left() + 4, 0, -margins.right() - 4, 0)
+        metrics = self.fontMetrics()
+        used = metrics.horizontalAdvance(self.text() + "  ")
+        room = rect.width() - used
+        if room < metrics.horizontalAdvance("→ …"):
+            return
+        label = metrics.elidedText(f"→ {self._preview}", Qt.ElideRight, room)
+        painter = QPainter(self)
+        painter.setPen(self.palette().placeholderText().color())
+        painter.drawText(rect.adjusted(used, 0, 0, 0), Qt.AlignVCenter | Qt.AlignLeft, label)
+        painter.end()
+
+    def _release(self):
+        self._unsubscribe()
+        self._executor.shutdown(wait=False, cancel_futures=True)
 
     def _update_completer(self, text: str):
         try:
             pos = self.cursorPosition()
             prefix = text[:pos]
 
-            start = prefix.rfind("{{")
-            if start == -1 or "}}" in prefix[start+2:]:
+            if compile_template(text).placeholder_start(pos) == -1:
+                self._generation += 1
+                self._pending_prefix = None
                 self.completer.popup().hide()
                 return
 
+            if self._last_result and self._last_result[0] == prefix:
+                self._show_suggestions(prefix, self._last_result[1])
+                return
+            if prefix == self._pending_prefix:
+                return
+
+            self._generation += 1
+            self._pending_prefix = prefix
+            self._executor.submit(self._compute_suggestions, self._generation, prefix)
+        except Exception as e:
+            logger.error(f"[PlaceholderLineEdit] erro ao atualizar completer: {e}")
+            self.completer.popup().hide()
+
+    def _compute_suggestions(self, generation: int, prefix: str):
+        if generation != self._generation:
+            return
+        try:
             suggestions = self.provider.suggestions(prefix)
+        except Exception as e:
+            logger.error(f"[PlaceholderLineEdit] erro ao calcular sugestões: {e}")
+            suggestions = []
+        try:
+            self.suggestionsReady.emit(generation, prefix, suggestions)
+        except RuntimeError:
+            pass  # widget já destruído
+
+    def _on_suggestions_ready(self, generation: int, prefix: str, suggestions: list):
+        if generation != self._generation:
+            return
+        self._pending_prefix = None
+        self._last_result = (prefix, suggestions)
+        if self.text()[:self.cursorPosition()] != prefix:
+            return
+        self._show_suggestions(prefix, suggestions)
+
+    def _show_suggestions(self, prefix: str, suggestions: list[str]):
+        try:
             if not suggestions:
                 self.completer.popup().hide()
                 return
 
+            start = prefix.rfind("{{")
             self.model.setStringList(suggestions)
             token = prefix[start+2:].strip()
             self.completer.setCompletionPrefix(token)
@@ -135,10 +482,11 @@ class PlaceholderLineEdit(QLineEdit):
 
     def _insert_completion(self, completion: str):
         try:
+            self.provider.record_usage(completion)
             text = self.text()
             pos = self.cursorPosition()
 
-            open_idx = text.rfind("{{", 0, pos)
+            open_idx = compile_template(text).placeholder_start(pos)
             if open_idx != -1:
                 close_idx = text.find("}}", open_idx + 2)
                 after = text[close_idx+2:] if close_idx != -1 else ""
@@ -0,0 +1,340 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from typing import Any, Callable, Iterable, Optional
+
+import requests
+
+logger = logging.getLogger("HttpResponseCache")
+
+CACHEABLE_METHODS = ("GET", "HEAD")
+CACHEABLE_STATUS = (200, 203)
+# respostas maiores não são guardadas por `request_streaming`
+STREAM_OVER_BYTES = 8 * 1024 * 1024
+
+
+def request_key(method: str, url: str, params=None, headers=None, data=None) -> str:
+    """Identidade da requisição: método, URL, params, headers e hash do corpo."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    if isinstance(data, (bytes, bytearray)):
+        body = hashlib.sha256(data).hexdigest()
+    elif data:
+        body = hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    else:
+        body = ""
+    identity = json.dumps([
+        (method or "GET").upper(),
+        url or "",
+        sorted((str(k), str(v)) for k, v in (params or {}).items()),
+        sorted((str(k).lower(), str(v)) for k, v in (headers or {}).items()),
+        body,
+    ])
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+
+def parse_cache_control(value: str | None) -> dict:
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') if arg else True
+    return directives
+
+
+class CachedResponse:
+    """Resposta HTTP servida pelo cache, com a interface usada de requests.Response."""
+    def __init__(self, status_code: int, headers: dict, content: bytes, url: str, from_cache: bool):
+        self.status_code = status_code
+        self.headers = requests.structures.CaseInsensitiveDict(headers)
+        self.content = content
+        self.url = url
+        self.from_cache = from_cache
+
+    @classmethod
+    def from_response(cls, resp) -> "CachedResponse":
+        return cls(resp.status_code, dict(resp.headers), resp.content, resp.url, False)
+
+    @property
+    def encoding(self) -> str:
+        ctype = self.headers.get("Content-Type", "")
+        for part in ctype.split(";"):
+            name, _, value = part.strip().partition("=")
+            if name.lower() == "charset" and value:
+                return value.strip('"')
+        return "utf-8"
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} para {self.url}", response=None)
+
+
+class HttpResponseCache:
+    """
+    Cache persistente (SQLite) de respostas HTTP.
+
+    A chave é `request_key` (método, URL, params, headers e hash do corpo).
+    Segue `Cache-Control` (max-age, no-cache, no-store) e `Expires`,
+    revalida entradas vencidas com If-None-Match/If-Modified-Since e aceita
+    um `ttl` por chamada que se sobrepõe aos cabeçalhos (inclusive no-store),
+    para variáveis cujo endpoint não informa política de cache. Entradas são
+    removidas por LRU quando o total passa de `max_bytes`.
+    """
+    def __init__(self, db_path: str = "http_cache.db", max_bytes: int = 50 * 1024 * 1024):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key           TEXT PRIMARY KEY,
+                url           TEXT,
+                status        INTEGER,
+                headers       TEXT,
+                body          BLOB,
+                size          INTEGER,
+                expires_at    REAL,
+                etag          TEXT,
+                last_modified TEXT,
+                last_access   REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_entries_access ON entries(last_access);
+        """)
+
+    def request(self,
+                send: Callable[..., requests.Response],
+                method: str,
+                url: str,
+                params=None,
+                headers=None,
+                data=None,
+                ttl: Optional[float] = None,
+                refresh: bool = False,
+                **kwargs) -> CachedResponse:
+        """
+        Executa a requisição através do cache.
+
+        :param send: função com a assinatura de `requests.request`.
+        :param ttl: validade em segundos que substitui os cabeçalhos de cache.
+        :param refresh: ignora a entrada fresca e consulta a rede (revalidando
+                        quando possível), atualizando o cache.
+        """
+        method = (method or "GET").upper()
+        cacheable = method in CACHEABLE_METHODS or ttl is not None
+        if not cacheable:
+            return CachedResponse.from_response(
+                send(method=method, url=url, params=params, headers=headers, data=data, **kwargs)
+            )
+
+        key, entry, now = self._lookup(method, url, params, headers, data)
+        if entry and not refresh and entry["expires_at"] > now:
+            self.hits += 1
+            self._touch(key, now)
+            return self._to_response(entry)
+
+        self.misses += 1
+        resp = send(method=method, url=url, params=params,
+                    headers=self._conditional_headers(headers, entry), data=data, **kwargs)
+
+        if resp.status_code == 304 and entry:
+            return self._revalidate(key, entry, resp.headers, ttl, now)
+
+        result = CachedResponse.from_response(resp)
+        self._store(key, result, ttl, now)
+        return result
+
+    def request_streaming(self,
+                          send: Callable[..., requests.Response],
+                          consume: Callable[[Iterable[bytes]], Any],
+                          method: str,
+                          url: str,
+                          params=None,
+                          headers=None,
+                          data=None,
+                          ttl: Optional[float] = None,
+                          stream_over: int = STREAM_OVER_BYTES,
+                          chunk_size: int = 64 * 1024,
+                          **kwargs) -> Any:
+        """
+        Como `request`, mas entrega o corpo a `consume(blocos)` e retorna o
+        resultado dela; status de erro levantam HTTPError antes.
+
+        Entradas frescas e revalidações (304) vêm do cache. Respostas
+        armazenáveis com Content-Length de até `stream_over` bytes são lidas
+        inteiras e guardadas como em `request`; as demais (maiores, sem
+        Content-Length ou não armazenáveis) vão em blocos da rede direto
+        para `consume`, sem passar pelo cache.
+        """
+        method = (method or "GET").upper()
+        cacheable = method in CACHEABLE_METHODS or ttl is not None
+        key, entry, now = self._lookup(method, url, params, headers, data) if cacheable else (None, None, time.time())
+        if entry and entry["expires_at"] > now:
+            self.hits += 1
+            self._touch(key, now)
+            return self._consume_cached(self._to_response(entry), consume)
+
+        self.misses += 1
+        resp = send(method=method, url=url, params=params,
+                    headers=self._conditional_headers(headers, entry), data=data,
+                    stream=True, **kwargs)
+        try:
+            if resp.status_code == 304 and entry:
+                return self._consume_cached(self._revalidate(key, entry, resp.headers, ttl, now), consume)
+            resp.raise_for_status()
+            if cacheable and self._storable(resp, ttl, now, stream_over):
+                result = CachedResponse.from_response(resp)
+                self._store(key, result, ttl, now)
+                return consume([result.content])
+            return consume(resp.iter_content(chunk_size))
+        finally:
+            resp.close()
+
+    @staticmethod
+    def _consume_cached(resp: CachedResponse, consume: Callable[[Iterable[bytes]], Any]) -> Any:
+        resp.raise_for_status()
+        return consume([resp.content])
+
+    def _storable(self, resp, ttl, now, stream_over: int) -> bool:
+        if resp.status_code not in CACHEABLE_STATUS or self._expires_at(resp.headers, ttl, now) is None:
+            return False
+        try:
+            return int(resp.headers.get("Content-Length", "")) <= stream_over
+        except ValueError:
+            return False
+
+    def _lookup(self, method, url, params, headers, data) -> tuple[str, Optional[dict], float]:
+        key = request_key(method, url, params, headers, data)
+        return key, self._get(key), time.time()
+
+    @staticmethod
+    def _conditional_headers(headers, entry: Optional[dict]) -> dict:
+        req_headers = dict(headers or {})
+        if entry:
+            if entry["etag"]:
+                req_headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                req_headers["If-Modified-Since"] = entry["last_modified"]
+        return req_headers
+
+    def _revalidate(self, key: str, entry: dict, headers, ttl, now) -> CachedResponse:
+        """Renova a validade da entrada após um 304 e a devolve."""
+        self.revalidated += 1
+        expires_at = self._expires_at(headers, ttl, now)
+        with self.lock:
+            self.conn.execute(
+                "UPDATE entries SET expires_at = ?, last_access = ? WHERE key = ?",
+                (expires_at if expires_at is not None else now, now, key)
+            )
+        return self._to_response(entry)
+
+    def _expires_at(self, headers, ttl, now) -> Optional[float]:
+        """Momento de expiração, ou None se a resposta não deve ser armazenada."""
+        if ttl is not None:
+            return now + ttl
+        cc = parse_cache_control(headers.get("Cache-Control"))
+        if "no-store" in cc:
+            return None
+        if "no-cache" in cc:
+            return now
+        # cache privado: `s-maxage` vale só para caches compartilhados
+        if "max-age" in cc:
+            max_age = cc["max-age"]
+            if not isinstance(max_age, str) or not max_age.isdigit():
+                return None     # `max-age` sem valor ou inválido
+            return now + int(max_age)
+        expires = headers.get("Expires")
+        if expires:
+            try:
+                return parsedate_to_datetime(expires).timestamp()
+            except (TypeError, ValueError):
+                return now
+        return now
+
+    def _store(self, key: str, resp: CachedResponse, ttl, now):
+        if resp.status_code not in CACHEABLE_STATUS:
+            return
+        expires_at = self._expires_at(resp.headers, ttl, now)
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        with self.lock:
+            if expires_at is None or (expires_at <= now and not etag and not last_modified):
+                self.conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, resp.url, resp.status_code, json.dumps(dict(resp.headers)),
+                 sqlite3.Binary(resp.content), len(resp.content), expires_at,
+                 etag, last_modified, now)
+            )
+            self._evict()
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self.conn.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall()
+        drop = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            drop.append((key,))
+            total -= size
+        self.conn.executemany("DELETE FROM entries WHERE key = ?", drop)
+
+    def _get(self, key: str) -> Optional[dict]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT url, status, headers, body, expires_at, etag, last_modified "
+                "FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        url, status, headers, body, expires_at, etag, last_modified = row
+        return {
+            "url": url, "status": status, "headers": json.loads(headers), "body": bytes(body),
+            "expires_at": expires_at, "etag": etag, "last_modified": last_modified,
+        }
+
+    def _touch(self, key: str, now: float):
+        with self.lock:
+            self.conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+
+    @staticmethod
+    def _to_response(entry: dict) -> CachedResponse:
+        return CachedResponse(entry["status"], entry["headers"], entry["body"], entry["url"], True)
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM entries")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+_shared_cache: HttpResponseCache | None = None
+_shared_lock = Lock()
+
+
+def get_response_cache() -> HttpResponseCache:
+    """Cache de respostas compartilhado pelo processo."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = HttpResponseCache()
+        return _shared_cache
@@ -0,0 +1,87 @@
+import logging
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from typing import Iterable
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger("HttpClient")
+
+
+class HttpClient:
+    """
+    Cliente HTTP compartilhado entre os resolvedores de variáveis.
+
+    Usa uma única `requests.Session` com keep-alive; o HTTPAdapter mantém um
+    pool de conexões por host (`pool_connections` hosts, até `pool_maxsize`
+    conexões cada), e os pools do urllib3 podem ser usados por várias threads.
+    `timeout` é aplicado quando a chamada não informa um, no formato
+    (conexão, leitura). Cookies recebidos não são guardados: como em
+    `requests.request`, cada variável envia só os cabeçalhos que declara, e
+    as chaves do cache e do single-flight continuam valendo.
+    """
+    _shared: "HttpClient | None" = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self,
+                 pool_connections: int = 16,
+                 pool_maxsize: int = 8,
+                 timeout: tuple[float, float] = (5.0, 10.0),
+                 max_retries: int = 0):
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=max_retries,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._prewarm_thread: threading.Thread | None = None
+
+    @classmethod
+    def shared(cls) -> "HttpClient":
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Mesma assinatura de `requests.request`, reaproveitando conexões."""
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method=method, url=url, **kwargs)
+
+    def prewarm(self, urls: Iterable[str], timeout: float = 3.0):
+        """
+        Abre em segundo plano uma conexão para cada host distinto em `urls`
+        (DNS, TCP e TLS), deixando-a no pool para a primeira resolução.
+        Falhas são apenas registradas.
+        """
+        origins = []
+        for url in urls:
+            try:
+                parts = urlsplit(url or "")
+            except ValueError:
+                continue
+            if parts.scheme in ("http", "https") and parts.netloc:
+                origin = f"{parts.scheme}://{parts.netloc}/"
+                if origin not in origins:
+                    origins.append(origin)
+        if not origins:
+            return
+
+        def run():
+            for origin in origins:
+                try:
+                    self.session.head(origin, timeout=timeout, allow_redirects=False)
+                except Exception as e:
+                    logger.info(f"Pré-aquecimento de {origin} falhou: {e}")
+
+        self._prewarm_thread = threading.Thread(target=run, name="http-prewarm", daemon=True)
+        self._prewarm_thread.start()
+
+    def close(self):
+        self.session.close()
@@ -2,19 +2,30 @@
 
 import json
 import os
-from threading import Lock
+from threading import RLock
+from typing import Callable, Iterable, Iterator
+
+from services.preferences_service import PreferencesService
 
 class LocalSessionService:
     """
     Serviço simples para CRUD de itens numa lista persistida em JSON.
     Usa file‐lock para evitar condições de corrida.
+
+    Mantém a lista em memória com um índice id → posição, recarregado apenas
+    quando o arquivo muda externamente (mtime/tamanho). Cada operação, simples
+    ou em lote (`put_many`, `update_many`, `delete_many`), grava o arquivo uma
+    única vez.
     """
     def __init__(self, file_path: str | None = None):
         if file_path:
             self.file_path = file_path
         else:
             self.file_path = "chatbot_tasks.json"
-        self.lock = Lock()
+        self.lock = RLock()
+        self._items: list[dict] = []
+        self._index: dict = {}
+        self._stamp = None
         self._ensure_file()
 
     def _ensure_file(self):
@@ -22,63 +33,144 @@ class LocalSessionService:
             with open(self.file_path, "w", encoding="utf-8") as f:
                 json.dump([], f)
 
+    def _file_stamp(self):
+        st = os.stat(self.file_path)
+        return st.st_mtime_ns, st.st_size
+
+    def _sync(self):
+        """Recarrega a lista do disco se o arquivo mudou desde a última leitura."""
+        stamp = self._file_stamp()
+        if stamp != self._stamp:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                self._items = json.load(f)
+            self._stamp = stamp
+            self._reindex()
+
+    def _reindex(self):
+        self._index = {}
+        for pos, item in enumerate(self._items):
+            self._index_item(item, pos)
+
+    def _index_item(self, item: dict, pos: int):
+        try:
+            self._index.setdefault(item.get("id"), []).append(pos)
+        except TypeError:
+            pass
+
     def read_all(self) -> list[dict]:
-        with self.lock, open(self.file_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with self.lock:
+            self._sync()
+            return list(self._items)
 
     def write_all(self, items: list[dict]):
         tmp = self.file_path + ".tmp"
-        with self.lock, open(tmp, "w", encoding="utf-8") as f:
-            json.dump(items, f, indent=2, default=str)
-        os.replace(tmp, self.file_path)
+        with self.lock:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(items, f, indent=2, default=str)
+            os.replace(tmp, self.file_path)
+            self._items = list(items)
+            self._stamp = self._file_stamp()
+            self._reindex()
 
-    def scan(self) -> list[dict]:
-        """Retorna todas as tasks."""
-        return self.read_all()
+    def _persist(self):
+        try:
+            self.write_all(self._items)
+        except Exception:
+            self._stamp = None  # força recarregar do disco na próxima operação
+            raise
+
+    def iter_scan(self,
+                  predicate: Callable[[dict], bool] | None = None,
+                  limit: int | None = None) -> Iterator[dict]:
+        """
+        Itera sobre as tasks sem montar uma nova lista, opcionalmente
+        filtrando por `predicate` e parando após `limit` itens.
+        """
+        with self.lock:
+            self._sync()
+            items = self._items
+        if limit is not None and limit <= 0:
+            return
+        count = 0
+        for item in items:
+            if predicate is None or predicate(item):
+                yield item
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+
+    def scan(self,
+             predicate: Callable[[dict], bool] | None = None,
+             limit: int | None = None) -> list[dict]:
+        """Retorna todas as tasks (ou as que satisfazem `predicate`, até `limit`)."""
+        return list(self.iter_scan(predicate, limit))
+
+    def get_item(self, item_id: str) -> dict | None:
+        """Busca a task pelo id usando o índice em memória."""
+        with self.lock:
+            self._sync()
+            positions = self._index.get(item_id)
+            return self._items[positions[0]] if positions else None
 
     def put_item(self, item: dict):
         """Adiciona uma nova task."""
-        data = self.read_all()
-        data.append(item)
-        self.write_all(data)
+        self.put_many([item])
+
+    def put_many(self, items: Iterable[dict]):
+        """Adiciona várias tasks gravando o arquivo uma única vez."""
+        with self.lock:
+            self._sync()
+            for item in items:
+                self._items.append(item)
+                self._index_item(item, len(self._items) - 1)
+            self._persist()
 
     def update_item(self, item_id: str, item: dict):
         """Substitui a task cujo id bate com item_id."""
-        data = self.read_all()
-        data = [item if i.get("id")==item_id else i for i in data]
-        self.write_all(data)
+        self.update_many({item_id: item})
+
+    def update_many(self, updates: dict):
+        """Substitui várias tasks ({id: item}) gravando o arquivo uma única vez."""
+        with self.lock:
+            self._sync()
+            changed = False
+            for item_id, item in updates.items():
+                for pos in self._index.get(item_id, ()):
+                    self._items[pos] = item
+                    changed = True
+            if changed:
+                self._persist()
 
     def delete_item(self, item_id: str):
         """Remove a task pelo id."""
-        data = self.read_all()
-        data = [i for i in data if i.get("id")!=item_id]
-        self.write_all(data)
+        self.delete_many([item_id])
+
+    def delete_many(self, item_ids: Iterable[str]):
+        """Remove várias tasks pelo id gravando o arquivo uma única vez."""
+        with self.lock:
+            self._sync()
+            drop = set()
+            for item_id in item_ids:
+                drop.update(self._index.get(item_id, ()))
+            if drop:
+                self._items = [i for pos, i in enumerate(self._items) if pos not in drop]
+                self._persist()
 
     def _get_pref_file(self):
         return self.file_path + ".prefs.json"
 
+    def _prefs(self) -> PreferencesService:
+        return PreferencesService.shared(self._get_pref_file())
+
     def write_session_data(self, key, value):
-        prefs_file = self._get_pref_file()
         try:
-            if not os.path.exists(prefs_file):
-                data = {}
-            else:
-                with open(prefs_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-            data[key] = value
-            with open(prefs_file, "w", encoding="utf-8") as f:
-                json.dump(data, f)
+            self._prefs().set(key, value)
         except Exception as e:
             print(f"[LocalSessionService] Erro ao salvar preferências: {e}")
 
     def read_session_data(self, key, default=None):
-        prefs_file = self._get_pref_file()
         try:
-            if not os.path.exists(prefs_file):
-                return default
-            with open(prefs_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return data.get(key, default)
+            return self._prefs().get(key, default)
         except Exception as e:
             print(f"[LocalSessionService] Erro ao ler preferências: {e}")
             return default
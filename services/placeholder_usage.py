@@ -0,0 +1,45 @@
+import math
+import time
+from threading import Lock
+
+from services.preferences_service import PreferencesService
+
+
+class PlaceholderUsageStats:
+    """
+    Frequência e recência dos placeholders efetivamente inseridos.
+
+    Os contadores ficam em memória e são persistidos pelo PreferencesService
+    (chave `placeholder_usage`), limitados aos `max_entries` mais recentes.
+    `boost` devolve o bônus de ranking: log da frequência somado a um termo
+    de recência que decai com meia-vida de `half_life` segundos.
+    """
+    PREF_KEY = "placeholder_usage"
+
+    def __init__(self,
+                 prefs: PreferencesService | None = None,
+                 max_entries: int = 500,
+                 half_life: float = 3 * 24 * 3600):
+        self.prefs = prefs or PreferencesService.shared()
+        self.max_entries = max_entries
+        self.half_life = half_life
+        self._lock = Lock()
+        self._usage: dict[str, list] = dict(self.prefs.get(self.PREF_KEY, {}) or {})
+
+    def record(self, placeholder: str):
+        with self._lock:
+            count, _ = self._usage.get(placeholder, (0, 0))
+            self._usage[placeholder] = [count + 1, time.time()]
+            if len(self._usage) > self.max_entries:
+                recent = sorted(self._usage.items(), key=lambda kv: kv[1][1], reverse=True)
+                self._usage = dict(recent[:self.max_entries])
+            snapshot = dict(self._usage)
+        self.prefs.set(self.PREF_KEY, snapshot)
+
+    def boost(self, placeholder: str) -> float:
+        entry = self._usage.get(placeholder)
+        if not entry:
+            return 0.0
+        count, last = entry
+        age = max(time.time() - last, 0.0)
+        return 1.5 * math.log1p(count) + 3.0 * 0.5 ** (age / self.half_life)
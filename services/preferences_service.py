@@ -1,24 +1,90 @@
 import json, os
+import logging
+from threading import Lock, RLock
+
+from services.write_behind import WriteBehindScheduler
+
+logger = logging.getLogger("PreferencesService")
+
+_MISSING = object()
 
 class PreferencesService:
-    def __init__(self, prefs_path="environment_variables.json.prefs.json"):
+    """
+    Armazena preferências chave/valor em memória, persistidas em JSON.
+
+    O arquivo é lido uma única vez; `set` altera apenas a memória e agenda uma
+    gravação em segundo plano que coalesce rajadas de alterações (por exemplo,
+    o arraste do splitter) numa única escrita atômica (arquivo temporário +
+    rename). Use `shared(path)` para obter a instância única de cada arquivo.
+    """
+    _shared: dict = {}
+    _shared_lock = Lock()
+
+    def __init__(self,
+                 prefs_path="environment_variables.json.prefs.json",
+                 flush_interval: float = 1.0,
+                 idle_delay: float = 0.3):
         self.prefs_path = prefs_path
-        self._ensure_file()
+        self._lock = RLock()
+        self._prefs = self._load()
+        self._scheduler = WriteBehindScheduler(
+            self._write,
+            flush_interval=flush_interval,
+            idle_delay=idle_delay,
+            name="preferences-writer"
+        )
+
+    @classmethod
+    def shared(cls, prefs_path="environment_variables.json.prefs.json") -> "PreferencesService":
+        """Retorna a instância compartilhada do processo para o arquivo informado."""
+        key = os.path.abspath(prefs_path)
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(prefs_path)
+            return cls._shared[key]
 
-    def _ensure_file(self):
+    def _load(self) -> dict:
         if not os.path.exists(self.prefs_path):
-            with open(self.prefs_path, "w", encoding="utf-8") as f:
-                json.dump({}, f)
+            return {}
+        try:
+            with open(self.prefs_path, "r", encoding="utf-8") as f:
+                prefs = json.load(f)
+            return prefs if isinstance(prefs, dict) else {}
+        except Exception as e:
+            logger.error(f"Falha ao ler preferências de {self.prefs_path}: {e}")
+            return {}
 
     def get(self, key, default=None):
-        with open(self.prefs_path, "r", encoding="utf-8") as f:
-            prefs = json.load(f)
-        return prefs.get(key, default)
+        with self._lock:
+            return self._prefs.get(key, default)
 
     def set(self, key, value):
-        with open(self.prefs_path, "r+", encoding="utf-8") as f:
-            prefs = json.load(f)
-            prefs[key] = value
-            f.seek(0)
-            json.dump(prefs, f, indent=2)
-            f.truncate()
+        self.set_many({key: value})
+
+    def set_many(self, values: dict):
+        with self._lock:
+            changed = {k: v for k, v in values.items() if self._prefs.get(k, _MISSING) != v}
+            if not changed:
+                return
+            self._prefs.update(changed)
+        self._scheduler.mark_dirty()
+
+    @property
+    def has_pending(self) -> bool:
+        return self._scheduler.pending
+
+    def flush(self):
+        """Grava imediatamente as alterações pendentes, se houver."""
+        self._scheduler.flush()
+
+    def close(self):
+        self._scheduler.close()
+
+    def _write(self):
+        with self._lock:
+            payload = json.dumps(self._prefs, indent=2)
+        tmp = self.prefs_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp, self.prefs_path)
+
@@ -0,0 +1,334 @@
+import json
+import logging
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import replace
+from typing import Any, Callable, Iterable, NamedTuple, Optional
+
+from interface.environment_variables import EnvironmentVariable
+from services.variable_fetcher import fetch_variable, stream_extract
+from utils.json_path import evaluate, split_root
+from utils.template import Reference, compile_template
+
+logger = logging.getLogger("ResolutionEngine")
+
+
+class ResolutionError(ValueError):
+    """Falha ao resolver uma variável ou caminho."""
+
+
+class CyclicDependencyError(ResolutionError):
+    def __init__(self, cycle: list[str]):
+        self.cycle = cycle
+        super().__init__(f"Dependência cíclica: {' -> '.join(cycle)}")
+
+
+class PathResult(NamedTuple):
+    """Resultado de um caminho num lote: valor ou mensagem de erro."""
+    value: Any
+    error: Optional[str] = None
+
+
+def references(text: Optional[str]) -> list[str]:
+    """Caminhos referenciados por `{{...}}` no texto, na ordem em que aparecem."""
+    return [ref.path for ref in compile_template(text).references]
+
+
+def _templated_fields(var: EnvironmentVariable) -> Iterable[str]:
+    if var.type == "static":
+        yield var.value or ""
+        return
+    yield var.url or ""
+    yield var.body or ""
+    for mapping in (var.params, var.headers, var.body_params):
+        for key, value in (mapping or {}).items():
+            yield key
+            yield value
+
+
+def dependencies(var: EnvironmentVariable) -> set[str]:
+    """Nomes das variáveis referenciadas em qualquer campo de `var`."""
+    deps = set()
+    for text in _templated_fields(var):
+        deps |= compile_template(text).names()
+    return deps
+
+
+def extract(var: EnvironmentVariable, data: Any, expr: str = "") -> Any:
+    """
+    Valor de `expr` dentro do dado resolvido da variável. Sem expressão, o
+    valor da variável é o `extract_path` aplicado ao dado (ou o dado inteiro).
+    """
+    if not expr:
+        expr = var.extract_path or ""
+    return evaluate(data, expr)
+
+
+def parse_response(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except (TypeError, ValueError):
+        return text
+
+
+def to_text(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list, bool)) or value is None:
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+class ResolutionEngine:
+    """
+    Resolve variáveis encadeadas por placeholders `{{VAR.caminho}}`.
+
+    Cada execução monta o grafo de dependências a partir dos campos das
+    variáveis (url, params, headers, body, body_params ou value), rejeita
+    ciclos e resolve os nós em ordem topológica: um nó é submetido ao pool
+    (até `max_workers` em paralelo) assim que todas as suas dependências
+    terminam, então ramos independentes avançam juntos e uma cadeia custa o
+    caminho crítico. O resultado de cada variável é memorizado durante a
+    execução; não há cache entre execuções além do cache HTTP.
+
+    Com `stream_max_bytes`, `resolve_path` lê a resposta da variável raiz
+    (HTTP e com caminho a extrair) de forma incremental via `stream`, parando
+    no valor pedido e recusando corpos acima do limite.
+    """
+    def __init__(self,
+                 variables: Iterable[EnvironmentVariable],
+                 max_workers: int = 4,
+                 fetch: Callable[..., Any] = fetch_variable,
+                 is_cancelled: Callable[[], bool] | None = None,
+                 stream_max_bytes: int | None = None,
+                 stream: Callable[..., Any] = stream_extract):
+        self.variables = {}
+        for var in variables:
+            self.variables.setdefault(var.name, var)
+        self.max_workers = max_workers
+        self.fetch = fetch
+        self.is_cancelled = is_cancelled or (lambda: False)
+        self.stream_max_bytes = stream_max_bytes
+        self.stream = stream
+
+    # ---- grafo ------------------------------------------------------------
+
+    def _var(self, name: str) -> EnvironmentVariable:
+        var = self.variables.get(name)
+        if var is None:
+            raise ResolutionError(f"Variável '{name}' não encontrada")
+        if not var.enabled:
+            raise ResolutionError(f"Variável '{name}' está desabilitada")
+        return var
+
+    def graph(self, roots: Iterable[str]) -> dict[str, set[str]]:
+        """Subgrafo alcançável a partir de `roots`: nome → dependências."""
+        graph: dict[str, set[str]] = {}
+        state: dict[str, int] = {}   # 1 = visitando, 2 = concluído
+        for root in roots:
+            if state.get(root) == 2:
+                continue
+            stack = [(root, None)]
+            path: list[str] = []
+            while stack:
+                name, deps_iter = stack.pop()
+                if deps_iter is None:
+                    if state.get(name) == 2:
+                        continue
+                    if state.get(name) == 1:
+                        raise CyclicDependencyError(path[path.index(name):] + [name])
+                    state[name] = 1
+                    path.append(name)
+                    graph[name] = dependencies(self._var(name))
+                    deps_iter = iter(sorted(graph[name]))
+                child = next(deps_iter, None)
+                if child is None:
+                    state[name] = 2
+                    path.pop()
+                    continue
+                stack.append((name, deps_iter))
+                if state.get(child) == 1:
+                    raise CyclicDependencyError(path[path.index(child):] + [child])
+                if state.get(child) != 2:
+                    stack.append((child, None))
+        return graph
+
+    # ---- execução ---------------------------------------------------------
+
+    def resolve(self, names: Iterable[str]) -> dict[str, Any]:
+        """Resolve as variáveis pedidas (e dependências); retorna nome → dado."""
+        results, _ = self._run(self.graph(names), fail_fast=True)
+        return results
+
+    def _run(self,
+             graph: dict[str, set[str]],
+             fail_fast: bool,
+             on_node: Callable[[str, Any, Optional[Exception]], None] | None = None
+             ) -> tuple[dict[str, Any], dict[str, Exception]]:
+        results: dict[str, Any] = {}
+        errors: dict[str, Exception] = {}
+        pending = {name: set(deps) for name, deps in graph.items()}
+        dependents: dict[str, list[str]] = {name: [] for name in graph}
+        for name, deps in graph.items():
+            for dep in deps:
+                dependents[dep].append(name)
+
+        def settle(name: str, value: Any, error: Optional[Exception]):
+            if error is None:
+                results[name] = value
+            else:
+                errors[name] = error
+            if on_node is not None:
+                on_node(name, value, error)
+            for child in dependents[name]:
+                if child in errors:
+                    continue
+                if error is not None:
+                    settle(child, None, ResolutionError(f"Dependência '{name}' falhou: {error}"))
+                    continue
+                pending[child].discard(name)
+                if not pending[child]:
+                    ready.append(child)
+
+        ready = [name for name, deps in pending.items() if not deps]
+        running: dict[Future, str] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="resolve") as pool:
+            while ready or running:
+                for name in ready:
+                    if self.is_cancelled():
+                        for other in running:
+                            other.cancel()
+                        raise InterruptedError("Resolução cancelada")
+                    running[pool.submit(self._resolve_node, name, results)] = name
+                ready = []
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        value, error = future.result(), None
+                    except InterruptedError:
+                        raise
+                    except ResolutionError as e:
+                        value, error = None, e
+                    except Exception as e:
+                        value, error = None, ResolutionError(f"Falha ao resolver '{name}': {e}")
+                        error.__cause__ = e
+                    if error is not None and fail_fast:
+                        for other in running:
+                            other.cancel()
+                        raise error
+                    settle(name, value, error)
+        return results, errors
+
+    def resolve_path(self, path: str) -> Any:
+        root, expr = split_root(path)
+        if not root:
+            raise ResolutionError("Caminho vazio")
+        var = self._var(root)
+        expr = expr or var.extract_path or ""
+        if self._streamable(var, expr):
+            return self._stream_path(var, expr)
+        data = self.resolve([root])[root]
+        return extract(var, data, expr)
+
+    def _streamable(self, var: EnvironmentVariable, expr: str) -> bool:
+        # sem caminho o documento inteiro é o resultado
+        return self.stream_max_bytes is not None and var.type == "http" and bool(expr)
+
+    def _stream_path(self, var: EnvironmentVariable, expr: str) -> Any:
+        # dependências resolvidas normalmente; só a raiz é lida em streaming
+        graph = self.graph([var.name])
+        del graph[var.name]
+        results, _ = self._run(graph, fail_fast=True) if graph else ({}, {})
+        if self.is_cancelled():
+            raise InterruptedError("Resolução cancelada")
+        return self.stream(self.materialize(var, results), expr, self.stream_max_bytes)
+
+    def resolve_paths(self,
+                      paths: Iterable[str],
+                      on_result: Callable[[str, PathResult], None] | None = None
+                      ) -> dict[str, PathResult]:
+        """
+        Resolve vários caminhos numa única execução. Os caminhos são
+        agrupados pela variável raiz, cada variável é buscada no máximo uma
+        vez e todos os caminhos são extraídos do mesmo resultado. Falhas são
+        por caminho (e propagadas às variáveis dependentes), sem interromper
+        os demais. `on_result(path, resultado)` é chamado assim que a raiz do
+        caminho termina, permitindo entregar resultados parciais.
+        """
+        by_root: dict[str, list[tuple[str, str]]] = {}
+        out: dict[str, PathResult] = {}
+
+        def emit(path: str, result: PathResult):
+            out[path] = result
+            if on_result is not None:
+                on_result(path, result)
+
+        for path in dict.fromkeys(paths):
+            root, expr = split_root(path)
+            if not root:
+                emit(path, PathResult(None, "Caminho vazio"))
+                continue
+            by_root.setdefault(root, []).append((path, expr))
+
+        graph: dict[str, set[str]] = {}
+        for root in by_root:
+            try:
+                graph.update(self.graph([root]))
+            except ResolutionError as e:
+                for path, _ in by_root[root]:
+                    emit(path, PathResult(None, str(e)))
+
+        def on_node(name: str, data: Any, error: Optional[Exception]):
+            for path, expr in by_root.get(name, ()):
+                if error is not None:
+                    emit(path, PathResult(None, str(error)))
+                    continue
+                try:
+                    emit(path, PathResult(extract(self.variables[name], data, expr)))
+                except (KeyError, ValueError) as e:
+                    emit(path, PathResult(None, e.args[0] if e.args else str(e)))
+
+        self._run(graph, fail_fast=False, on_node=on_node)
+        return out
+
+    def materialize(self, var: EnvironmentVariable, results: dict[str, Any] | None = None) -> EnvironmentVariable:
+        """
+        Cópia de `var` com os placeholders substituídos. Sem `results`, as
+        dependências são resolvidas antes (usado para testar a variável).
+        """
+        if results is None:
+            results = self.resolve(dependencies(var)) if dependencies(var) else {}
+
+        def lookup(ref: Reference) -> str:
+            return to_text(extract(self.variables[ref.root], results[ref.root], ref.expr))
+
+        def render(text):
+            if not text or "{{" not in text:
+                return text
+            return compile_template(text).render(lookup)
+
+        if var.type == "static":
+            return replace(var, value=render(var.value))
+        return replace(
+            var,
+            url=render(var.url),
+            body=render(var.body),
+            params={render(k): render(v) for k, v in (var.params or {}).items()},
+            headers={render(k): render(v) for k, v in (var.headers or {}).items()},
+            body_params={render(k): render(v) for k, v in (var.body_params or {}).items()},
+        )
+
+    def _resolve_node(self, name: str, results: dict[str, Any]) -> Any:
+        if self.is_cancelled():
+            raise InterruptedError("Resolução cancelada")
+        var = self.materialize(self._var(name), results)
+        if var.type == "static":
+            return var.value
+        if var.type == "http":
+            resp = self.fetch(var)
+            resp.raise_for_status()
+            try:
+                return resp.json()
+            except ValueError:
+                return resp.text
+        raise ResolutionError(f"Tipo '{var.type}' não suportado")
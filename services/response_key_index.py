@@ -0,0 +1,122 @@
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from threading import RLock
+from typing import Optional
+
+from services.write_behind import WriteBehindScheduler
+
+logger = logging.getLogger("ResponseKeyIndex")
+
+# separador interno dos caminhos; não aparece em chaves JSON usuais
+SEP = "\x1f"
+
+
+class ResponseKeyIndex:
+    """
+    Índice persistente de caminhos de chaves de respostas JSON.
+
+    Para cada conteúdo (identificado pelo hash SHA-1 do texto) guarda, para
+    cada objeto aninhado, a lista das chaves filhas:
+        {"": ["data"], "data": ["user", "usr2"], ...}
+    O índice é construído uma única vez por conteúdo, mantido em memória com
+    limite LRU de `max_entries` conteúdos e gravado em `cache_path` em segundo
+    plano, para não reinterpretar respostas grandes após reiniciar.
+    """
+    def __init__(self,
+                 cache_path: str | None = "environment_variables.json.keyindex.json",
+                 max_entries: int = 256):
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+        self._lock = RLock()
+        self._entries: "OrderedDict[str, dict[str, list[str]]]" = OrderedDict()
+        self._scheduler = None
+        if cache_path:
+            self._load()
+            self._scheduler = WriteBehindScheduler(
+                self._write, flush_interval=5.0, idle_delay=1.0, name="key-index-writer"
+            )
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        return hashlib.sha1((text or "").encode("utf-8", "surrogatepass")).hexdigest()
+
+    @staticmethod
+    def build(text: str) -> dict[str, list[str]]:
+        """Interpreta o JSON e monta o mapa caminho → chaves filhas."""
+        try:
+            data = json.loads(text)
+        except Exception:
+            return {}
+        index: dict[str, list[str]] = {}
+        stack = [("", data)]
+        while stack:
+            path, node = stack.pop()
+            if not isinstance(node, dict):
+                continue
+            index[path] = list(node.keys())
+            for key, child in node.items():
+                if isinstance(child, dict):
+                    stack.append((f"{path}{SEP}{key}" if path else key, child))
+        return index
+
+    def ensure(self, text: str, content_hash: str | None = None) -> str:
+        """
+        Garante o índice do conteúdo e retorna seu hash. `content_hash`, se
+        dado, só serve para renovar uma entrada existente no LRU; se ela não
+        estiver mais em memória, o hash é recalculado a partir de `text`, de
+        modo que o índice gravado sempre corresponde ao conteúdo.
+        """
+        with self._lock:
+            if content_hash is not None and content_hash in self._entries:
+                self._entries.move_to_end(content_hash)
+                return content_hash
+        h = self.content_hash(text)
+        with self._lock:
+            if h in self._entries:
+                self._entries.move_to_end(h)
+                return h
+        index = self.build(text)
+        with self._lock:
+            self._entries[h] = index
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        if self._scheduler is not None:
+            self._scheduler.mark_dirty()
+        return h
+
+    def child_keys(self, content_hash: str, path: list[str]) -> Optional[list[str]]:
+        """Chaves do objeto em `path`, ou None se o caminho não for um objeto."""
+        with self._lock:
+            index = self._entries.get(content_hash)
+        if index is None:
+            return None
+        return index.get(SEP.join(path))
+
+    def flush(self):
+        if self._scheduler is not None:
+            self._scheduler.flush()
+
+    def close(self):
+        if self._scheduler is not None:
+            self._scheduler.close()
+
+    def _load(self):
+        if not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._entries = OrderedDict(data.get("entries", []))
+        except Exception as e:
+            logger.error(f"Falha ao ler índice de chaves de {self.cache_path}: {e}")
+
+    def _write(self):
+        with self._lock:
+            payload = json.dumps({"entries": list(self._entries.items())}, ensure_ascii=False)
+        tmp = self.cache_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp, self.cache_path)
@@ -0,0 +1,330 @@
+import json
+import logging
+import os
+import sqlite3
+from itertools import islice
+from threading import Lock
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from interface.environment_variables import EnvironmentVariable
+from services.variable_service import VariableService
+
+logger = logging.getLogger("SqliteStorage")
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    """Abre uma conexão compartilhável entre threads em modo WAL."""
+    conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    return conn
+
+
+def _dumps(data) -> str:
+    return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class SqliteVariableService(VariableService):
+    """
+    Backend SQLite para as variáveis de ambiente, com a mesma API do
+    VariableService (load_all/save_all, write-behind, flush, close).
+
+    Cada variável ocupa uma linha indexada pela posição na lista e pelo nome.
+    `save_all` compara a lista com o último estado conhecido e grava apenas
+    as linhas alteradas; `get`, `count` e `page` consultam o banco sem
+    carregar todas as variáveis.
+    """
+    def __init__(self, db_path="environment_variables.db", **kwargs):
+        self.conn = connect(db_path)
+        self._state: Optional[list[dict]] = None
+        super().__init__(db_path, **kwargs)
+
+    def _ensure_file(self):
+        with self.lock:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS variables (
+                    position INTEGER PRIMARY KEY,
+                    name     TEXT NOT NULL,
+                    data     TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_variables_name ON variables(name);
+            """)
+
+    def load_all(self) -> List[EnvironmentVariable]:
+        try:
+            with self.lock:
+                rows = self.conn.execute("SELECT data FROM variables ORDER BY position").fetchall()
+                self._state = [json.loads(r[0]) for r in rows]
+            return [EnvironmentVariable(**json.loads(r[0])) for r in rows]
+        except Exception as e:
+            logger.error(f"Falha ao carregar variáveis de {self.file_path}: {e}")
+            return []
+
+    def get(self, name: str) -> Optional[EnvironmentVariable]:
+        """Busca a primeira variável com o nome informado usando o índice."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT data FROM variables WHERE name = ? ORDER BY position LIMIT 1", (name,)
+            ).fetchone()
+        return EnvironmentVariable(**json.loads(row[0])) if row else None
+
+    def count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM variables").fetchone()[0]
+
+    def page(self, offset: int = 0, limit: int = 100) -> List[EnvironmentVariable]:
+        """Retorna até `limit` variáveis a partir da posição `offset`."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT data FROM variables WHERE position >= ? ORDER BY position LIMIT ?",
+                (offset, limit)
+            ).fetchall()
+        return [EnvironmentVariable(**json.loads(r[0])) for r in rows]
+
+    def _persist(self, data: list[dict]):
+        with self.lock:
+            if self._state is None:
+                rows = self.conn.execute("SELECT data FROM variables ORDER BY position").fetchall()
+                self._state = [json.loads(r[0]) for r in rows]
+            old = self._state
+            cur = self.conn.cursor()
+            cur.execute("BEGIN")
+            try:
+                start = 0
+                # remoção de um único item: desloca as posições num só UPDATE
+                if len(data) == len(old) - 1:
+                    k = next((i for i, (a, b) in enumerate(zip(old, data)) if a != b), len(data))
+                    if old[k + 1:] == data[k:]:
+                        cur.execute("DELETE FROM variables WHERE position = ?", (k,))
+                        cur.execute("UPDATE variables SET position = -position WHERE position > ?", (k,))
+                        cur.execute("UPDATE variables SET position = -position - 1 WHERE position < 0")
+                        old = old[:k] + old[k + 1:]
+                        start = len(data)
+                for i in range(start, len(data)):
+                    item = data[i]
+                    if i < len(old) and old[i] == item:
+                        continue
+                    cur.execute(
+                        "INSERT OR REPLACE INTO variables (position, name, data) VALUES (?, ?, ?)",
+                        (i, item.get("name", ""), _dumps(item))
+                    )
+                cur.execute("DELETE FROM variables WHERE position >= ?", (len(data),))
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+            self._state = list(data)
+
+    def import_json(self, json_path: str) -> int:
+        """Importa as variáveis de um arquivo JSON do VariableService."""
+        with open(json_path, "r", encoding="utf-8") as f:
+            items = json.load(f)
+        self._persist(items)
+        return len(items)
+
+    def close(self):
+        super().close()
+        with self.lock:
+            self.conn.close()
+
+
+class SqliteSessionService:
+    """
+    Backend SQLite para o LocalSessionService, com as mesmas assinaturas.
+
+    Os itens ficam numa tabela indexada por `id`, então `update_item` e
+    `delete_item` gravam apenas as linhas afetadas; `scan` aceita `offset`
+    e `limit` para paginação. As preferências de sessão ficam na tabela
+    `session_data` do mesmo banco.
+    """
+    def __init__(self, file_path: str | None = None):
+        self.file_path = file_path or "chatbot_tasks.db"
+        self.lock = Lock()
+        self.conn = connect(self.file_path)
+        with self.lock:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS items (
+                    seq  INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id,
+                    data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_items_id ON items(id);
+                CREATE TABLE IF NOT EXISTS session_data (key TEXT PRIMARY KEY, value TEXT);
+            """)
+
+    def read_all(self) -> list[dict]:
+        return self.scan()
+
+    def write_all(self, items: list[dict]):
+        def replace_all():
+            self.conn.execute("DELETE FROM items")
+            self._insert(items)
+        with self.lock:
+            self._transaction(replace_all)
+
+    def scan(self,
+             offset: int = 0,
+             limit: int | None = None,
+             *,
+             predicate: Callable[[dict], bool] | None = None) -> list[dict]:
+        """
+        Retorna as tasks, opcionalmente paginadas; com `predicate`, a
+        paginação vale sobre as tasks que o satisfazem.
+        """
+        if predicate is not None:
+            stop = None if limit is None else offset + limit
+            return list(islice(self.iter_scan(predicate, stop), offset, None))
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT data FROM items ORDER BY seq LIMIT ? OFFSET ?",
+                (-1 if limit is None else limit, offset)
+            ).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def iter_scan(self,
+                  predicate: Callable[[dict], bool] | None = None,
+                  limit: int | None = None,
+                  batch_size: int = 500) -> Iterator[dict]:
+        """Itera sobre as tasks lendo o banco em lotes de `batch_size`."""
+        last_seq, count = 0, 0
+        while limit is None or count < limit:
+            with self.lock:
+                rows = self.conn.execute(
+                    "SELECT seq, data FROM items WHERE seq > ? ORDER BY seq LIMIT ?",
+                    (last_seq, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for seq, data in rows:
+                last_seq = seq
+                item = json.loads(data)
+                if predicate is None or predicate(item):
+                    yield item
+                    count += 1
+                    if limit is not None and count >= limit:
+                        return
+
+    def count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def get_item(self, item_id) -> dict | None:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT data FROM items WHERE id = ? ORDER BY seq LIMIT 1", (item_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_item(self, item: dict):
+        """Adiciona uma nova task."""
+        with self.lock:
+            self._insert([item])
+
+    def put_many(self, items: Iterable[dict]):
+        """Adiciona várias tasks numa única transação."""
+        with self.lock:
+            self._transaction(lambda: self._insert(items))
+
+    def update_item(self, item_id: str, item: dict):
+        """Substitui a task cujo id bate com item_id."""
+        self.update_many({item_id: item})
+
+    def update_many(self, updates: dict):
+        """Substitui várias tasks ({id: item}) numa única transação."""
+        with self.lock:
+            self._transaction(lambda: self.conn.executemany(
+                "UPDATE items SET id = ?, data = ? WHERE id = ?",
+                ((item.get("id"), _dumps(item), item_id) for item_id, item in updates.items())
+            ))
+
+    def delete_item(self, item_id: str):
+        """Remove a task pelo id."""
+        self.delete_many([item_id])
+
+    def delete_many(self, item_ids: Iterable[str]):
+        """Remove várias tasks pelo id numa única transação."""
+        with self.lock:
+            self._transaction(lambda: self.conn.executemany(
+                "DELETE FROM items WHERE id = ?", ((i,) for i in item_ids)
+            ))
+
+    def write_session_data(self, key, value):
+        try:
+            with self.lock:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO session_data (key, value) VALUES (?, ?)",
+                    (key, json.dumps(value))
+                )
+        except Exception as e:
+            logger.error(f"Erro ao salvar preferências: {e}")
+
+    def read_session_data(self, key, default=None):
+        try:
+            with self.lock:
+                row = self.conn.execute(
+                    "SELECT value FROM session_data WHERE key = ?", (key,)
+                ).fetchone()
+            return json.loads(row[0]) if row else default
+        except Exception as e:
+            logger.error(f"Erro ao ler preferências: {e}")
+            return default
+
+    def import_json(self, json_path: str) -> int:
+        """Importa as tasks (e preferências) de um arquivo do LocalSessionService."""
+        with open(json_path, "r", encoding="utf-8") as f:
+            items = json.load(f)
+        self.write_all(items)
+        prefs_file = json_path + ".prefs.json"
+        if os.path.exists(prefs_file):
+            with open(prefs_file, "r", encoding="utf-8") as f:
+                for key, value in json.load(f).items():
+                    self.write_session_data(key, value)
+        return len(items)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def _transaction(self, fn):
+        self.conn.execute("BEGIN")
+        try:
+            fn()
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def _insert(self, items: Iterable[dict]):
+        self.conn.executemany(
+            "INSERT INTO items (id, data) VALUES (?, ?)",
+            ((i.get("id"), _dumps(i)) for i in items)
+        )
+
+
+def migrate_json_to_sqlite(service, json_path: str) -> bool:
+    """
+    Migração única de um arquivo JSON para um backend SQLite
+    (SqliteVariableService ou SqliteSessionService).
+
+    Registra a origem na tabela `meta`; chamadas seguintes para o mesmo banco
+    não fazem nada. O arquivo JSON original é mantido intacto.
+    Retorna True se a migração foi executada.
+    """
+    key = "migrated_from"
+    with service.lock:
+        row = service.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    if row is not None or not os.path.exists(json_path):
+        return False
+    try:
+        count = service.import_json(json_path)
+        with service.lock:
+            service.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (key, os.path.abspath(json_path))
+            )
+        logger.info(f"{count} registros migrados de {json_path} para {service.file_path}")
+        return True
+    except Exception as e:
+        logger.error(f"Falha ao migrar {json_path} para {service.file_path}: {e}")
+        return False
@@ -0,0 +1,71 @@
+from interface.environment_variables import EnvironmentVariable
+from services.http_cache import CachedResponse, get_response_cache, request_key
+from services.http_client import HttpClient
+from services.single_flight import SingleFlight
+from utils.json_stream import extract_stream
+
+DEFAULT_TIMEOUT = (5.0, 10.0)
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# requisições idênticas em andamento são compartilhadas entre os resolvedores
+inflight = SingleFlight()
+
+
+def request_args(var: EnvironmentVariable) -> dict:
+    """Argumentos de `requests.request` para uma variável HTTP."""
+    if var.content_type == "application/x-www-form-urlencoded":
+        data = var.body_params or None
+    else:
+        data = var.body.encode("utf-8") if var.body else None
+    return {
+        "method": var.method or "GET",
+        "url": var.url,
+        "params": var.params,
+        "headers": var.headers,
+        "data": data,
+    }
+
+
+def fetch_variable(var: EnvironmentVariable,
+                   refresh: bool = False,
+                   timeout: float | tuple[float, float] = DEFAULT_TIMEOUT) -> CachedResponse:
+    """
+    Executa a requisição da variável através do cache de respostas.
+    `refresh=True` ignora a entrada ainda fresca (usado no teste manual),
+    mas continua atualizando o cache com o resultado. As conexões vêm do
+    pool compartilhado de `HttpClient`. Chamadas concorrentes com a mesma
+    requisição efetiva compartilham uma única ida à rede (`inflight`).
+    """
+    args = request_args(var)
+    key = (request_key(**args), refresh)
+    return inflight.do(key, lambda: get_response_cache().request(
+        HttpClient.shared().request,
+        ttl=var.cache_ttl,
+        refresh=refresh,
+        timeout=timeout,
+        **args
+    ))
+
+
+def stream_extract(var: EnvironmentVariable,
+                   expression: str,
+                   max_bytes: int | None = None,
+                   timeout: float | tuple[float, float] = DEFAULT_TIMEOUT):
+    """
+    Extrai `expression` da resposta da variável lendo o corpo em streaming
+    e parando no valor pedido (até `max_bytes`, ResponseTooLargeError acima).
+    Passa pelo cache de respostas (`request_streaming`: entradas frescas,
+    revalidação e armazenamento de respostas pequenas) e, como
+    `fetch_variable`, extrações idênticas em andamento compartilham uma
+    única ida à rede (`inflight`).
+    """
+    args = request_args(var)
+    key = (request_key(**args), "stream", expression, max_bytes)
+    return inflight.do(key, lambda: get_response_cache().request_streaming(
+        HttpClient.shared().request,
+        lambda chunks: extract_stream(chunks, expression, max_bytes),
+        ttl=var.cache_ttl,
+        chunk_size=STREAM_CHUNK_SIZE,
+        timeout=timeout,
+        **args
+    ))
@@ -0,0 +1,269 @@
+import copy
+import json
+import logging
+import os
+import threading
+import zlib
+from typing import List, Optional
+
+from interface.environment_variables import EnvironmentVariable
+from services.variable_service import VariableService
+
+logger = logging.getLogger("VariableJournalService")
+
+_MISSING = object()
+
+
+class JournalVariableService(VariableService):
+    """
+    Motor de armazenamento de variáveis baseado em snapshot + journal.
+
+    O snapshot é o mesmo arquivo JSON do VariableService. Cada `save_all`
+    compara a lista com o último estado gravado e anexa ao journal apenas
+    registros pequenos por variável (campos alterados, inclusão, remoção).
+    `load_all` lê o snapshot e reaplica o journal. Quando o journal passa de
+    `compact_threshold` bytes, ele é consolidado num novo snapshot em segundo
+    plano.
+
+    Formato do journal: uma linha por registro, `<crc32 hex> <json>\\n`. A
+    primeira linha é `{"op": "base", "crc": ...}` com o CRC do snapshot ao qual
+    o journal se aplica; um journal cujo base não bate com o snapshot já foi
+    consolidado e é ignorado. Linhas incompletas ou com CRC inválido no final
+    do arquivo (gravação interrompida) são descartadas no carregamento.
+    """
+    def __init__(self,
+                 file_path="environment_variables.json",
+                 compact_threshold: int = 1024 * 1024,
+                 fsync: bool = True,
+                 **kwargs):
+        self.journal_path = file_path + ".journal"
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+        self._state: Optional[list[dict]] = None
+        self._journal = None
+        self._compacting = False
+        self._compact_thread: Optional[threading.Thread] = None
+        super().__init__(file_path, **kwargs)
+
+    # ---- API de compatibilidade --------------------------------------------
+
+    def load_all(self) -> List[EnvironmentVariable]:
+        try:
+            with self.lock:
+                self._state = self._recover()
+                state = self._state
+            return [EnvironmentVariable(**copy.deepcopy(item)) for item in state]
+        except Exception as e:
+            logger.error(f"Falha ao carregar variáveis de {self.file_path}: {e}")
+            return []
+
+    def close(self):
+        super().close()
+        if self._compact_thread is not None:
+            self._compact_thread.join()
+        with self.lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    # ---- gravação incremental ----------------------------------------------
+
+    def _persist(self, data: list[dict]):
+        with self.lock:
+            if self._state is None:
+                self._state = self._recover()
+            records = self._diff(self._state, data)
+            if not records:
+                return
+            self._append(records)
+            for record in records:
+                self._apply(self._state, record)
+            size = self._journal.tell()
+        if size >= self.compact_threshold:
+            self._start_compaction()
+
+    @staticmethod
+    def _diff(old: list[dict], new: list[dict]) -> list[dict]:
+        records = []
+        # remoção de um único item: evita regravar todos os itens deslocados
+        if len(new) == len(old) - 1:
+            k = next((i for i, (a, b) in enumerate(zip(old, new)) if a != b), len(new))
+            if old[k + 1:] == new[k:]:
+                return [{"op": "del", "i": k}]
+        for i, item in enumerate(new):
+            if i >= len(old):
+                records.append({"op": "put", "i": i, "v": item})
+                continue
+            changed = {k: v for k, v in item.items() if old[i].get(k, _MISSING) != v}
+            if changed:
+                records.append({"op": "set", "i": i, "f": changed})
+        if len(new) < len(old):
+            records.append({"op": "len", "n": len(new)})
+        return records
+
+    @staticmethod
+    def _apply(state: list[dict], record: dict):
+        op = record["op"]
+        if op == "set":
+            i = record["i"]
+            state[i] = {**state[i], **copy.deepcopy(record["f"])}
+        elif op == "put":
+            i = record["i"]
+            item = copy.deepcopy(record["v"])
+            if i == len(state):
+                state.append(item)
+            else:
+                state[i] = item
+        elif op == "del":
+            del state[record["i"]]
+        elif op == "len":
+            del state[record["n"]:]
+        elif op != "base":
+            raise ValueError(f"Operação de journal desconhecida: {op}")
+
+    def _append(self, records: list[dict]):
+        self._journal.write(b"".join(self._encode(r) for r in records))
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+
+    @staticmethod
+    def _encode(record: dict) -> bytes:
+        payload = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return b"%08x " % zlib.crc32(payload) + payload + b"\n"
+
+    @staticmethod
+    def _decode(line: bytes) -> Optional[dict]:
+        if not line.endswith(b"\n") or len(line) < 10 or line[8:9] != b" ":
+            return None
+        payload = line[9:-1]
+        try:
+            if int(line[:8], 16) != zlib.crc32(payload):
+                return None
+            return json.loads(payload.decode("utf-8"))
+        except ValueError:
+            return None
+
+    # ---- recuperação --------------------------------------------------------
+
+    def _recover(self) -> list[dict]:
+        """Lê snapshot + journal, descarta cauda corrompida e reabre o journal."""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+        raw = b"[]"
+        if os.path.exists(self.file_path):
+            with open(self.file_path, "rb") as f:
+                raw = f.read()
+        state = json.loads(raw.decode("utf-8") or "[]")
+        base_crc = zlib.crc32(raw)
+
+        tmp_journal = self.journal_path + ".tmp"
+        path = None
+        for candidate in (self.journal_path, tmp_journal):
+            if self._journal_base(candidate) == base_crc:
+                path = candidate
+                break
+        if path == tmp_journal:
+            # consolidação interrompida após a troca do snapshot
+            os.replace(tmp_journal, self.journal_path)
+            path = self.journal_path
+        elif os.path.exists(tmp_journal):
+            os.remove(tmp_journal)
+
+        if path is None:
+            if os.path.exists(self.journal_path):
+                logger.warning(f"Journal {self.journal_path} não corresponde ao snapshot; descartado")
+            self._write_journal(self.journal_path, base_crc, b"")
+        else:
+            good = self._replay(path, state)
+            with open(path, "r+b") as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() > good:
+                    logger.warning(f"Cauda corrompida descartada em {path} ({f.tell() - good} bytes)")
+                    f.truncate(good)
+
+        self._journal = open(self.journal_path, "ab")
+        return state
+
+    def _journal_base(self, path: str) -> Optional[int]:
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            header = self._decode(f.readline())
+        if not header or header.get("op") != "base":
+            return None
+        return header.get("crc")
+
+    def _replay(self, path: str, state: list[dict]) -> int:
+        """Aplica os registros válidos e retorna o offset do último íntegro."""
+        good = 0
+        with open(path, "rb") as f:
+            for line in f:
+                record = self._decode(line)
+                if record is None:
+                    break
+                try:
+                    self._apply(state, record)
+                except (KeyError, IndexError, ValueError) as e:
+                    logger.warning(f"Registro inválido no journal {path}: {e}")
+                    break
+                good += len(line)
+        return good
+
+    def _write_journal(self, path: str, base_crc: int, tail: bytes):
+        with open(path, "wb") as f:
+            f.write(self._encode({"op": "base", "crc": base_crc}))
+            f.write(tail)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+
+    # ---- consolidação -------------------------------------------------------
+
+    def _start_compaction(self):
+        with self.lock:
+            if self._compacting:
+                return
+            self._compacting = True
+        self._compact_thread = threading.Thread(
+            target=self.compact, name="variable-journal-compactor", daemon=True
+        )
+        self._compact_thread.start()
+
+    def compact(self):
+        """Consolida o journal num novo snapshot."""
+        try:
+            with self.lock:
+                if self._state is None:
+                    self._state = self._recover()
+                state = list(self._state)
+                offset = self._journal.tell()
+
+            raw = json.dumps(state, indent=2, ensure_ascii=False).encode("utf-8")
+            snapshot_tmp = self.file_path + ".snapshot.tmp"
+            with open(snapshot_tmp, "wb") as f:
+                f.write(raw)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+
+            with self.lock:
+                self._journal.close()
+                with open(self.journal_path, "rb") as f:
+                    f.seek(offset)
+                    tail = f.read()
+                self._write_journal(self.journal_path + ".tmp", zlib.crc32(raw), tail)
+                os.replace(snapshot_tmp, self.file_path)
+                os.replace(self.journal_path + ".tmp", self.journal_path)
+                self._journal = open(self.journal_path, "ab")
+            logger.info(f"Journal consolidado em {self.file_path}")
+        except Exception as e:
+            logger.error(f"Falha ao consolidar journal de {self.file_path}: {e}")
+            with self.lock:
+                if self._journal is None or self._journal.closed:
+                    self._journal = open(self.journal_path, "ab")
+        finally:
+            self._compacting = False
+
@@ -0,0 +1,193 @@
+import logging
+from dataclasses import dataclass
+from threading import Lock, RLock
+from typing import Any, Callable, List, Optional
+
+from interface.environment_variables import EnvironmentVariable
+from services.variable_service import VariableService
+
+logger = logging.getLogger("VariableRepository")
+
+ADDED   = "added"
+REMOVED = "removed"
+UPDATED = "updated"
+RESET   = "reset"
+
+
+@dataclass(frozen=True)
+class VariableChange:
+    """
+    Evento de alteração publicado pelo VariableRepository.
+
+    `kind` é um de ADDED, REMOVED, UPDATED ou RESET. Para UPDATED, `field`
+    indica o atributo alterado e `old_value` o valor anterior.
+    """
+    kind: str
+    index: int
+    variable: Optional[EnvironmentVariable] = None
+    field: Optional[str] = None
+    old_value: Any = None
+
+
+def create_variable_service(backend: str = "json", **kwargs) -> VariableService:
+    """
+    Cria o motor de armazenamento de variáveis.
+
+    :param backend: "json" (arquivo único), "journal" (snapshot + journal)
+                    ou "sqlite" (banco SQLite em modo WAL, migrando o JSON
+                    existente na primeira execução).
+    :param kwargs: repassados ao construtor do serviço escolhido.
+    """
+    if backend == "json":
+        return VariableService(**kwargs)
+    if backend == "journal":
+        from services.variable_journal_service import JournalVariableService
+        return JournalVariableService(**kwargs)
+    if backend == "sqlite":
+        from services.sqlite_storage import SqliteVariableService, migrate_json_to_sqlite
+        json_path = kwargs.pop("json_path", "environment_variables.json")
+        service = SqliteVariableService(**kwargs)
+        migrate_json_to_sqlite(service, json_path)
+        return service
+    raise ValueError(f"Backend de variáveis desconhecido: {backend}")
+
+
+class VariableRepository:
+    """
+    Repositório único, em memória, das variáveis de ambiente do processo.
+
+    Carrega a lista uma única vez pelo VariableService, atende leituras da
+    memória e publica eventos VariableChange para os assinantes (controller,
+    provedor de sugestões etc.) a cada alteração. As gravações em disco são
+    delegadas ao VariableService (em modo write-behind por padrão).
+    """
+    _instance = None
+    _instance_lock = Lock()
+
+    def __init__(self, service: VariableService | None = None):
+        self.service = service or VariableService(write_behind=True, flush_interval=1.0)
+        self._lock = RLock()
+        self._vars: List[EnvironmentVariable] = []
+        self._subscribers: list[Callable[[VariableChange], None]] = []
+        self._loaded = False
+
+    @classmethod
+    def instance(cls) -> "VariableRepository":
+        """Retorna o repositório compartilhado do processo, criando-o se preciso."""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    # ---- leitura ----------------------------------------------------------
+
+    @property
+    def variables(self) -> List[EnvironmentVariable]:
+        """Lista viva de variáveis; não deve ser alterada diretamente."""
+        self._ensure_loaded()
+        return self._vars
+
+    def snapshot(self) -> List[EnvironmentVariable]:
+        """Cópia rasa da lista, segura para uso em outras threads."""
+        self._ensure_loaded()
+        with self._lock:
+            return list(self._vars)
+
+    def find(self, name: str) -> Optional[EnvironmentVariable]:
+        for var in self.snapshot():
+            if var.name == name:
+                return var
+        return None
+
+    def __len__(self):
+        return len(self.variables)
+
+    def __getitem__(self, index: int) -> EnvironmentVariable:
+        return self.variables[index]
+
+    # ---- escrita ----------------------------------------------------------
+
+    def load(self) -> List[EnvironmentVariable]:
+        """(Re)carrega as variáveis do disco e publica um evento RESET."""
+        with self._lock:
+            self._vars = self.service.load_all()
+            self._loaded = True
+        self._publish(VariableChange(RESET, -1))
+        return self._vars
+
+    def add(self, var: EnvironmentVariable) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            self._vars.append(var)
+            index = len(self._vars) - 1
+            self._save()
+        self._publish(VariableChange(ADDED, index, var))
+        return index
+
+    def remove(self, index: int) -> EnvironmentVariable:
+        with self._lock:
+            self._ensure_loaded()
+            removed = self._vars.pop(index)
+            self._save()
+        self._publish(VariableChange(REMOVED, index, removed))
+        return removed
+
+    def update(self, index: int, **fields) -> list[str]:
+        """
+        Atualiza campos da variável no índice informado.
+        Publica um evento UPDATED por campo efetivamente alterado e retorna
+        a lista desses campos.
+        """
+        changes = []
+        with self._lock:
+            self._ensure_loaded()
+            var = self._vars[index]
+            for name, value in fields.items():
+                if not hasattr(var, name):
+                    raise AttributeError(f"Campo '{name}' inexistente em EnvironmentVariable")
+                old = getattr(var, name)
+                if old == value:
+                    continue
+                setattr(var, name, value)
+                changes.append(VariableChange(UPDATED, index, var, name, old))
+            if changes:
+                self._save()
+        for change in changes:
+            self._publish(change)
+        return [c.field for c in changes]
+
+    def flush(self):
+        self.service.flush()
+
+    def close(self):
+        self.service.close()
+
+    # ---- notificações -----------------------------------------------------
+
+    def subscribe(self, callback: Callable[[VariableChange], None]) -> Callable[[], None]:
+        """Registra um assinante e retorna a função que cancela a assinatura."""
+        self._subscribers.append(callback)
+
+        def unsubscribe():
+            try:
+                self._subscribers.remove(callback)
+            except ValueError:
+                pass
+        return unsubscribe
+
+    def _publish(self, change: VariableChange):
+        for callback in list(self._subscribers):
+            try:
+                callback(change)
+            except Exception as e:
+                logger.error(f"Erro ao notificar assinante sobre '{change.kind}': {e}")
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._vars = self.service.load_all()
+                    self._loaded = True
+
+    def _save(self):
+        self.service.save_all(self._vars)
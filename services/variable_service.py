@@ -2,16 +2,39 @@ import json
 import os
 import logging
 from threading import Lock
-from typing import List
+from typing import List, Optional
 
 from interface.environment_variables import EnvironmentVariable
+from services.write_behind import WriteBehindScheduler
 
 logger = logging.getLogger("VariableService")
 
 class VariableService:
-    def __init__(self, file_path="environment_variables.json"):
+    """
+    Persiste a lista de variáveis de ambiente em JSON.
+
+    Com `write_behind=True`, `save_all` apenas marca a lista como pendente e a
+    gravação é feita em segundo plano, coalescendo rajadas de alterações em no
+    máximo uma escrita a cada `flush_interval` segundos (ou após `idle_delay`
+    segundos sem alterações). Use `flush()` para gravar imediatamente e
+    `close()` no encerramento da aplicação.
+    """
+    def __init__(self,
+                 file_path="environment_variables.json",
+                 write_behind: bool = False,
+                 flush_interval: float = 1.0,
+                 idle_delay: float = 0.3):
         self.file_path = file_path
         self.lock = Lock()
+        self._pending_vars: Optional[List[EnvironmentVariable]] = None
+        self._scheduler = None
+        if write_behind:
+            self._scheduler = WriteBehindScheduler(
+                self._flush_pending,
+                flush_interval=flush_interval,
+                idle_delay=idle_delay,
+                name="variable-service-writer"
+            )
         try:
             self._ensure_file()
         except Exception as e:
@@ -37,11 +60,43 @@ class VariableService:
             return []
 
     def save_all(self, vars: List[EnvironmentVariable]):
+        if self._scheduler is None:
+            try:
+                self._persist(self._snapshot(vars))
+            except Exception as e:
+                logger.error(f"Falha ao salvar variáveis em {self.file_path}: {e}")
+            return
+        self._pending_vars = vars
+        self._scheduler.mark_dirty()
+
+    @property
+    def has_pending(self) -> bool:
+        """True se há alterações aguardando gravação em segundo plano."""
+        return self._scheduler is not None and self._scheduler.pending
+
+    def flush(self):
+        """Grava imediatamente as alterações pendentes, se houver."""
+        if self._scheduler is not None:
+            self._scheduler.flush()
+
+    def close(self):
+        """Encerra a gravação em segundo plano garantindo o flush final."""
+        if self._scheduler is not None:
+            self._scheduler.close()
+
+    def _flush_pending(self):
+        vars = self._pending_vars
+        if vars is not None:
+            self._persist(self._snapshot(vars))
+
+    @staticmethod
+    def _snapshot(vars: List[EnvironmentVariable]) -> list[dict]:
+        # cópia rasa: os campos são substituídos (nunca mutados) pelo controller
+        return [dict(v.__dict__) for v in list(vars)]
+
+    def _persist(self, data: list[dict]):
         tmp = self.file_path + ".tmp"
-        try:
-            with self.lock, open(tmp, "w", encoding="utf-8") as f:
-                json.dump([v.__dict__ for v in vars], f, indent=2, ensure_ascii=False)
-            os.replace(tmp, self.file_path)
-            #logger.info(f"{len(vars)} variáveis salvas em {self.file_path}")
-        except Exception as e:
-            logger.error(f"Falha ao salvar variáveis em {self.file_path}: {e}")
+        with self.lock, open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, self.file_path)
+        #logger.info(f"{len(data)} variáveis salvas em {self.file_path}")
@@ -1,61 +1,125 @@
 import logging
-import requests
-from PyQt5.QtCore import QThread, pyqtSignal
+import threading
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
 
 from interface.environment_variables import EnvironmentVariable
+from services.resolution_engine import PathResult, ResolutionEngine
+from utils.json_path import split_root
 
 logger = logging.getLogger("PathWorker")
 
-class PathWorker(QThread):
+CANCELLED_MESSAGE = "Resolução cancelada"
+
+
+class PathWorkerSignals(QObject):
     success  = pyqtSignal(object)
     error    = pyqtSignal(str)
     finished = pyqtSignal()
 
-    def __init__(self, path: str, vars_list: list[EnvironmentVariable]):
+
+class PathWorker(QRunnable):
+    """
+    Resolve um caminho `VAR.chave[0].subchave` em uma thread do pool, incluindo
+    as variáveis das quais `VAR` depende (ver ResolutionEngine).
+    Os sinais ficam em `signals` (QRunnable não é QObject); `success`,
+    `error` e `finished` são atalhos para eles. Após `cancel()`, o worker
+    não faz a requisição nem emite `success`, e sim `error` com
+    CANCELLED_MESSAGE. Com `stream_max_bytes`, a resposta da variável raiz é
+    lida em streaming até o valor pedido (ver ResolutionEngine).
+    """
+    def __init__(self, path: str, vars_list: list[EnvironmentVariable], stream_max_bytes: int | None = None):
         super().__init__()
+        self.setAutoDelete(False)
         self.path      = path
         self.vars_list = vars_list
+        self.stream_max_bytes = stream_max_bytes
+        self.signals   = PathWorkerSignals()
+        self.success   = self.signals.success
+        self.error     = self.signals.error
+        self.finished  = self.signals.finished
+        self._cancelled = threading.Event()
+
+    @property
+    def root_names(self) -> frozenset[str]:
+        return frozenset((split_root(self.path)[0],))
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
 
     def run(self):
         try:
-            parts   = [p.strip() for p in self.path.split(".") if p.strip()]
-            var_name = parts[0]
-
-            var = next((v for v in self.vars_list if v.name == var_name), None)
-            if var is None:
-                raise ValueError(f"Variável '{var_name}' não encontrada")
-            if not var.enabled:
-                raise ValueError(f"Variável '{var_name}' está desabilitada")
-
-
-            if var.type == "static":
-                data = var.value
-            elif var.type == "http":
-                resp = requests.request(
-                    method=var.method or "GET",
-                    url=var.url,
-                    params=var.params,
-                    headers=var.headers,
-                    data=var.body.encode("utf-8") if var.body else None,
-                    timeout=10
-                )
-                resp.raise_for_status()
-                try:
-                    data = resp.json()
-                except ValueError:
-                    data = resp.text
-            else:
-                raise ValueError(f"Tipo '{var.type}' não suportado")
-
-            for key in parts[1:]:
-                if isinstance(data, dict) and key in data:
-                    data = data[key]
-                else:
-                    raise KeyError(f"Chave '{key}' não encontrada em '{data}'")
+            if self.is_cancelled():
+                raise InterruptedError(CANCELLED_MESSAGE)
+
+            engine = ResolutionEngine(self.vars_list,
+                                      is_cancelled=self.is_cancelled,
+                                      stream_max_bytes=self.stream_max_bytes)
+            data = engine.resolve_path(self.path)
 
+            if self.is_cancelled():
+                raise InterruptedError(CANCELLED_MESSAGE)
             self.success.emit(data)
+        except InterruptedError as e:
+            self.error.emit(str(e))
         except Exception as e:
             logger.error(f"[PathWorker] erro ao resolver '{self.path}': {e}")
             self.error.emit(str(e))
         finally:
-            self.finished.emit()
\ No newline at end of file
+            self.finished.emit()
+
+
+class BatchPathWorkerSignals(PathWorkerSignals):
+    partial = pyqtSignal(str, object)
+
+
+class BatchPathWorker(QRunnable):
+    """
+    Resolve vários caminhos numa única execução do ResolutionEngine.
+    `partial(path, PathResult)` é emitido conforme cada variável raiz termina;
+    `success` recebe, ao final, o dicionário caminho → PathResult.
+    """
+    def __init__(self, paths: list[str], vars_list: list[EnvironmentVariable]):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.paths     = list(paths)
+        self.vars_list = vars_list
+        self.signals   = BatchPathWorkerSignals()
+        self.partial   = self.signals.partial
+        self.success   = self.signals.success
+        self.error     = self.signals.error
+        self.finished  = self.signals.finished
+        self._cancelled = threading.Event()
+
+    @property
+    def root_names(self) -> frozenset[str]:
+        return frozenset(root for root, _ in map(split_root, self.paths) if root)
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def _emit_partial(self, path: str, result: PathResult):
+        if not self.is_cancelled():
+            self.partial.emit(path, result)
+
+    def run(self):
+        try:
+            if self.is_cancelled():
+                raise InterruptedError(CANCELLED_MESSAGE)
+            engine = ResolutionEngine(self.vars_list, is_cancelled=self.is_cancelled)
+            results = engine.resolve_paths(self.paths, on_result=self._emit_partial)
+            if self.is_cancelled():
+                raise InterruptedError(CANCELLED_MESSAGE)
+            self.success.emit(results)
+        except InterruptedError as e:
+            self.error.emit(str(e))
+        except Exception as e:
+            logger.error(f"[BatchPathWorker] erro ao resolver {len(self.paths)} caminhos: {e}")
+            self.error.emit(str(e))
+        finally:
+            self.finished.emit()
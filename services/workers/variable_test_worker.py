@@ -0,0 +1,77 @@
+import logging
+import threading
+from typing import Any, NamedTuple
+from PyQt5.QtCore import QRunnable
+
+from interface.environment_variables import EnvironmentVariable
+from services.resolution_engine import ResolutionEngine, extract, parse_response
+from services.variable_fetcher import fetch_variable
+from services.workers.path_worker import CANCELLED_MESSAGE, PathWorkerSignals
+
+logger = logging.getLogger("VariableTestWorker")
+
+
+class TestResult(NamedTuple):
+    """Resposta de um teste, com `extract_path` já aplicado ao corpo."""
+    status_code: int
+    text: str
+    extract_path: str
+    extracted_value: Any
+
+
+class VariableTestWorker(QRunnable):
+    """
+    Executa o teste de uma variável HTTP fora da thread da interface, com os
+    placeholders dos campos substituídos pelas variáveis de que ela depende.
+    `success` recebe um TestResult: o corpo é decodificado e interpretado
+    aqui, não na thread da interface. Após `cancel()` o resultado é
+    descartado e `error` recebe CANCELLED_MESSAGE.
+    """
+    def __init__(self, var: EnvironmentVariable, vars_list: list[EnvironmentVariable]):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.var       = var
+        self.vars_list = vars_list
+        self.signals   = PathWorkerSignals()
+        self.success   = self.signals.success
+        self.error     = self.signals.error
+        self.finished  = self.signals.finished
+        self._cancelled = threading.Event()
+
+    @property
+    def root_names(self) -> frozenset[str]:
+        return frozenset((self.var.name,))
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def run(self):
+        try:
+            if self.is_cancelled():
+                raise InterruptedError(CANCELLED_MESSAGE)
+            engine = ResolutionEngine(self.vars_list, is_cancelled=self.is_cancelled)
+            response = fetch_variable(engine.materialize(self.var), refresh=True)
+            if self.is_cancelled():
+                raise InterruptedError(CANCELLED_MESSAGE)
+            self.success.emit(self._result(response))
+        except InterruptedError as e:
+            self.error.emit(str(e))
+        except Exception as e:
+            logger.error(f"Erro ao testar variável '{self.var.name}': {e}")
+            self.error.emit(str(e))
+        finally:
+            self.finished.emit()
+
+    def _result(self, response) -> TestResult:
+        text = response.text
+        path = self.var.extract_path or ""
+        value = None
+        if path and text:
+            try:
+                value = extract(self.var, parse_response(text))
+            except (KeyError, ValueError) as e:
+                logger.warning(f"Extração '{path}' falhou para '{self.var.name}': {e}")
+        return TestResult(response.status_code, text, path, value)
@@ -0,0 +1,88 @@
+import logging
+from typing import Optional
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSlot
+
+from services.workers.path_worker import CANCELLED_MESSAGE
+
+logger = logging.getLogger("PathWorkerPool")
+
+
+class QueueFullError(RuntimeError):
+    """A fila do pool atingiu o limite configurado."""
+
+
+class JobHandle:
+    """Referência a um job submetido; permite cancelá-lo."""
+    def __init__(self, pool: "PathWorkerPool", worker: QRunnable, keys: frozenset[str]):
+        self._pool = pool
+        self.worker = worker
+        self.keys = keys
+
+    @property
+    def cancelled(self) -> bool:
+        return self.worker.is_cancelled()
+
+    def cancel(self):
+        self._pool.cancel_job(self)
+
+
+class PathWorkerPool(QObject):
+    """
+    Pool limitado para resolução de caminhos.
+
+    Executa os workers de resolução (PathWorker, BatchPathWorker e
+    VariableTestWorker) em um QThreadPool próprio com até `max_threads`
+    threads; no máximo `max_queue` jobs podem aguardar além dos que estão
+    rodando. Jobs terminados são liberados assim que `finished` chega à
+    thread da interface. `cancel(key)` cancela todos os jobs de uma variável:
+    os que ainda estão na fila são retirados antes de chegar à rede.
+    """
+    def __init__(self, max_threads: int = 4, max_queue: int = 32, parent=None):
+        super().__init__(parent)
+        self.max_queue = max_queue
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_threads)
+        self._jobs: dict[int, JobHandle] = {}
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def submit(self, worker: QRunnable, key: Optional[str] = None) -> JobHandle:
+        """
+        Enfileira o worker. `key` é a variável à qual o job pertence; por
+        padrão, as variáveis raiz do worker (`root_names`).
+        """
+        if len(self._jobs) >= self._pool.maxThreadCount() + self.max_queue:
+            raise QueueFullError(f"Fila de resolução cheia ({len(self._jobs)} jobs)")
+        keys = frozenset((key,)) if key is not None else worker.root_names
+        handle = JobHandle(self, worker, keys)
+        self._jobs[id(worker.signals)] = handle
+        worker.signals.finished.connect(self._release)
+        self._pool.start(worker)
+        return handle
+
+    def cancel_job(self, handle: JobHandle):
+        handle.worker.cancel()
+        if self._pool.tryTake(handle.worker):
+            # nunca vai rodar: encerra aqui para que os callbacks sejam chamados
+            handle.worker.error.emit(CANCELLED_MESSAGE)
+            handle.worker.finished.emit()
+
+    def cancel(self, key: str) -> int:
+        handles = [h for h in self._jobs.values() if key in h.keys and not h.cancelled]
+        for handle in handles:
+            self.cancel_job(handle)
+        return len(handles)
+
+    def cancel_all(self):
+        for handle in list(self._jobs.values()):
+            self.cancel_job(handle)
+
+    def shutdown(self, timeout_ms: int = 3000):
+        self.cancel_all()
+        self._pool.waitForDone(timeout_ms)
+
+    @pyqtSlot()
+    def _release(self):
+        self._jobs.pop(id(self.sender()), None)
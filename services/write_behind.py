@@ -0,0 +1,97 @@
+import atexit
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger("WriteBehind")
+
+
+class WriteBehindScheduler:
+    """
+    Agenda gravações em segundo plano, coalescendo rajadas de alterações.
+
+    Cada chamada a `mark_dirty` apenas marca o estado como pendente. Uma thread
+    dedicada executa `flush_fn` quando não há novas alterações por `idle_delay`
+    segundos ou, no máximo, `flush_interval` segundos após a primeira alteração
+    pendente. `flush()` grava imediatamente e `close()` garante a gravação final.
+    """
+    def __init__(self,
+                 flush_fn: Callable[[], None],
+                 flush_interval: float = 1.0,
+                 idle_delay: float = 0.3,
+                 name: str = "write-behind"):
+        self._flush_fn = flush_fn
+        self.flush_interval = flush_interval
+        self.idle_delay = min(idle_delay, flush_interval)
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._dirty = False
+        self._first_dirty_at: Optional[float] = None
+        self._last_dirty_at: Optional[float] = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def pending(self) -> bool:
+        """True se existem alterações ainda não gravadas."""
+        with self._cond:
+            return self._dirty
+
+    def mark_dirty(self):
+        with self._cond:
+            now = time.monotonic()
+            if not self._dirty:
+                self._first_dirty_at = now
+            self._dirty = True
+            self._last_dirty_at = now
+            self._cond.notify()
+
+    def flush(self):
+        """Grava imediatamente, na thread chamadora, se houver algo pendente."""
+        with self._flush_lock:
+            with self._cond:
+                if not self._dirty:
+                    return
+                self._dirty = False
+                self._first_dirty_at = self._last_dirty_at = None
+            try:
+                self._flush_fn()
+            except Exception as e:
+                logger.error(f"Falha na gravação em segundo plano: {e}")
+                self.mark_dirty()
+
+    def close(self):
+        """Encerra a thread de gravação garantindo o flush final."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout=5)
+        self.flush()
+        try:
+            atexit.unregister(self.close)
+        except Exception:
+            pass
+
+    def _deadline(self) -> float:
+        return min(self._last_dirty_at + self.idle_delay,
+                   self._first_dirty_at + self.flush_interval)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if not self._dirty:
+                        self._cond.wait()
+                        continue
+                    remaining = self._deadline() - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed:
+                    return
+            self.flush()
@@ -0,0 +1,131 @@
+import heapq
+from typing import Callable, Iterable, NamedTuple, Optional
+
+_BOUNDARY = "._-/ :"
+
+
+class FuzzyCandidate(NamedTuple):
+    """Candidato pré-processado: texto original e segmentos (por '.') normalizados."""
+    text: str
+    segments: tuple[str, ...]
+    folded: tuple[str, ...]
+    mask: int
+
+
+def _char_mask(text: str) -> int:
+    mask = 0
+    for ch in text:
+        mask |= 1 << (ord(ch) & 63)
+    return mask
+
+
+def make_candidate(text: str) -> FuzzyCandidate:
+    segments = tuple(text.split("."))
+    folded = tuple(s.casefold() for s in segments)
+    return FuzzyCandidate(text, segments, folded, _char_mask("".join(folded)))
+
+
+def compile_query(query: str) -> tuple[list[str], int]:
+    """Pré-processa a consulta: segmentos normalizados e máscara de caracteres."""
+    qsegs = query.casefold().split(".")
+    return qsegs, _char_mask("".join(qsegs))
+
+
+def _word_starts(original: str) -> list[bool]:
+    """
+    Para cada caractere de `original.casefold()`, se ele começa uma palavra
+    em `original`. `casefold` pode alongar o texto ("ß" → "ss"); os
+    caracteres extras herdam False.
+    """
+    starts = []
+    for j, ch in enumerate(original):
+        start = j > 0 and (original[j - 1] in _BOUNDARY or (ch.isupper() and original[j - 1].islower()))
+        starts.append(start)
+        starts.extend([False] * (len(ch.casefold()) - 1))
+    return starts
+
+
+def segment_score(query: str, folded: str, original: str) -> Optional[float]:
+    """
+    Pontua `query` como subsequência de um segmento, ou None se não casar.
+    Favorece início do segmento, início de palavra (após '_', '-' ou numa
+    transição camelCase), caracteres consecutivos e segmentos curtos.
+    """
+    if not query:
+        return 0.0
+    if len(folded) == len(original):
+        # casefold caractere a caractere: os índices coincidem
+        def word_start(i):
+            return original[i - 1] in _BOUNDARY or (original[i].isupper() and original[i - 1].islower())
+    else:
+        starts = _word_starts(original)
+
+        def word_start(i):
+            return starts[i]
+    score = 0.0
+    pos = 0
+    prev = -2
+    for ch in query:
+        i = folded.find(ch, pos)
+        if i < 0:
+            return None
+        if i == 0:
+            score += 3.0
+        elif word_start(i):
+            score += 2.0
+        if i == prev + 1:
+            score += 1.5
+        else:
+            score -= 0.1 * (i - pos)
+        score += 1.0
+        prev = i
+        pos = i + 1
+    if len(query) == len(folded):
+        score += 2.0
+    return score - 0.02 * len(folded)
+
+
+def fuzzy_score(query: str | tuple[list[str], int], candidate: FuzzyCandidate) -> Optional[float]:
+    """
+    Pontua a consulta contra um caminho pontuado (`tok.acc` → `TOKEN.access_token`).
+    Cada segmento da consulta deve casar, em ordem, com um segmento do
+    candidato; segmentos do candidato pulados são penalizados.
+    `query` pode ser a string ou o resultado de `compile_query`.
+    """
+    qsegs, qmask = compile_query(query) if isinstance(query, str) else query
+    if qmask & candidate.mask != qmask:
+        return None
+    total = 0.0
+    j = 0
+    n = len(candidate.folded)
+    for q in qsegs:
+        while j < n:
+            s = segment_score(q, candidate.folded[j], candidate.segments[j])
+            j += 1
+            if s is not None:
+                total += s
+                break
+            total -= 1.0
+        else:
+            return None
+    return total - (n - j)
+
+
+def top_k(query: str,
+          candidates: Iterable[FuzzyCandidate],
+          k: int,
+          boost: Callable[[str], float] | None = None) -> list[tuple[float, str]]:
+    """Retorna os k melhores (pontuação, texto), em ordem decrescente, via heap limitado."""
+    compiled = compile_query(query)
+
+    def scored():
+        for cand in candidates:
+            score = fuzzy_score(compiled, cand)
+            if score is None:
+                continue
+            if boost is not None:
+                score += boost(cand.text)
+            yield score, cand.text
+
+    # nlargest mantém um heap de k itens e, em empate, preserva a ordem de entrada
+    return heapq.nlargest(k, scored(), key=lambda item: item[0])
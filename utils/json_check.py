@@ -0,0 +1,61 @@
+import json
+import re
+from typing import NamedTuple, Optional
+
+# strings (possivelmente sem a aspa final) e delimitadores; o resto é ignorado
+_TOKEN_RE = re.compile(r'"(?:[^"\\\n]|\\.)*(?P<end>")?|[\[\]{}]')
+_PAIRS = {"]": "[", "}": "{"}
+
+
+class JsonIssue(NamedTuple):
+    """Primeiro erro encontrado: mensagem e posição (linha e coluna a partir de 1)."""
+    message: str
+    line: int
+    column: int
+
+
+def _issue_at(text: str, pos: int, message: str) -> JsonIssue:
+    line = text.count("\n", 0, pos) + 1
+    column = pos - (text.rfind("\n", 0, pos) + 1) + 1
+    return JsonIssue(message, line, column)
+
+
+def structural_issue(text: str) -> Optional[JsonIssue]:
+    """
+    Verificação rápida de estrutura: strings não terminadas e chaves ou
+    colchetes desbalanceados. Só strings e delimitadores são visitados (o
+    resto é pulado pela regex) e nenhum valor é montado; não detecta
+    vírgulas, dois-pontos ou literais inválidos.
+    """
+    stack: list[tuple[str, int]] = []
+    for m in _TOKEN_RE.finditer(text):
+        tok = m.group(0)
+        if tok[0] == '"':
+            if m.group("end") is None:
+                return _issue_at(text, m.start(), "String não terminada")
+            continue
+        if tok in "[{":
+            stack.append((tok, m.start()))
+        elif not stack or stack[-1][0] != _PAIRS[tok]:
+            return _issue_at(text, m.start(), f"'{tok}' inesperado")
+        else:
+            stack.pop()
+    if stack:
+        return _issue_at(text, stack[-1][1], f"'{stack[-1][0]}' não fechado")
+    return None
+
+
+def json_issue(text: str, full: bool = True) -> Optional[JsonIssue]:
+    """
+    Primeiro erro de `text` como JSON, ou None se for válido (ou vazio).
+    Com `full=False` apenas `structural_issue` é aplicada.
+    """
+    if not text.strip():
+        return None
+    if not full:
+        return structural_issue(text)
+    try:
+        json.loads(text)
+    except json.JSONDecodeError as e:
+        return JsonIssue(e.msg, e.lineno, e.colno)
+    return None
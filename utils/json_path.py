@@ -0,0 +1,321 @@
+import operator
+import re
+from functools import lru_cache
+from typing import Any, Callable, Iterator, Optional
+
+_MISSING = object()
+
+
+class JsonPathError(ValueError):
+    """Expressão de caminho inválida."""
+
+
+_TOKEN_RE = re.compile(r"""
+      (?P<recursive>\.\.)
+    | (?P<dot>\.)
+    | (?P<wild>\*)
+    | \[\s*(?P<bracket>
+          \?\(.*?\)                             # filtro
+        | '(?:[^'\\]|\\.)*'(?:\s*,\s*'(?:[^'\\]|\\.)*')*   # chaves entre aspas simples
+        | "(?:[^"\\]|\\.)*"(?:\s*,\s*"(?:[^"\\]|\\.)*")*   # chaves entre aspas duplas
+        | [^\]]*
+      )\s*\]
+    | (?P<name>[^.\[\]]+)
+""", re.VERBOSE)
+
+_FILTER_RE = re.compile(r"""
+    ^\?\(\s*@(?P<path>(?:\.[^\s=!<>()]+|\[[^\]]+\])*)\s*
+    (?:(?P<op>==|!=|<=|>=|<|>)\s*(?P<value>.+?))?\s*\)$
+""", re.VERBOSE)
+
+_OPS: dict[str, Callable[[Any, Any], bool]] = {
+    "==": operator.eq, "!=": operator.ne,
+    "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+}
+
+
+def _unquote(text: str) -> str:
+    return re.sub(r"\\(.)", r"\1", text[1:-1])
+
+
+def _literal(text: str) -> Any:
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "'\"":
+        return _unquote(text)
+    if text in ("true", "false"):
+        return text == "true"
+    if text == "null":
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        raise JsonPathError(f"Literal inválido no filtro: {text}")
+
+
+# Cada passo recebe um nó e produz os nós seguintes.
+Step = Callable[[Any], Iterator[Any]]
+
+
+def _key_step(key: str) -> Step:
+    index = int(key) if key.lstrip("-").isdigit() else None
+
+    def step(node):
+        if isinstance(node, dict):
+            if key in node:
+                yield node[key]
+        elif index is not None and isinstance(node, list) and -len(node) <= index < len(node):
+            yield node[index]
+    return step
+
+
+def _keys_step(keys: list[str]) -> Step:
+    def step(node):
+        if isinstance(node, dict):
+            for key in keys:
+                if key in node:
+                    yield node[key]
+    return step
+
+
+def _index_step(indexes: list[int]) -> Step:
+    def step(node):
+        if isinstance(node, list):
+            for i in indexes:
+                if -len(node) <= i < len(node):
+                    yield node[i]
+    return step
+
+
+def _slice_step(sl: slice) -> Step:
+    def step(node):
+        if isinstance(node, list):
+            yield from node[sl]
+    return step
+
+
+def _wildcard_step(node):
+    if isinstance(node, dict):
+        yield from node.values()
+    elif isinstance(node, list):
+        yield from node
+
+
+def _descendants(node):
+    yield node
+    if isinstance(node, dict):
+        for child in node.values():
+            yield from _descendants(child)
+    elif isinstance(node, list):
+        for child in node:
+            yield from _descendants(child)
+
+
+def _filter_step(expr: str) -> Step:
+    m = _FILTER_RE.match(expr)
+    if not m:
+        raise JsonPathError(f"Filtro inválido: {expr}")
+    inner = compile_path(m.group("path") or "")
+    op = _OPS.get(m.group("op") or "")
+    expected = _literal(m.group("value")) if op else None
+
+    def matches(item) -> bool:
+        value = inner.first(item, _MISSING)
+        if value is _MISSING:
+            return False
+        if op is None:
+            return bool(value)
+        try:
+            return op(value, expected)
+        except TypeError:
+            return False
+
+    def step(node):
+        items = node.values() if isinstance(node, dict) else node if isinstance(node, list) else ()
+        for item in items:
+            if matches(item):
+                yield item
+    return step
+
+
+def _bracket_step(content: str) -> tuple[Step, Any]:
+    """
+    Converte o conteúdo de `[...]` em um passo. O segundo item é a chave
+    (str) ou índice (int) literal de um passo singular, ou _MISSING.
+    """
+    if content.startswith("?"):
+        return _filter_step(content), _MISSING
+    if content == "*":
+        return _wildcard_step, _MISSING
+    if content[:1] in "'\"":
+        keys = [_unquote(k.strip()) for k in re.findall(r"""'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*\"""", content)]
+        return (_key_step(keys[0]), keys[0]) if len(keys) == 1 else (_keys_step(keys), _MISSING)
+    if ":" in content:
+        parts = content.split(":")
+        if len(parts) > 3:
+            raise JsonPathError(f"Fatia inválida: [{content}]")
+        try:
+            bounds = [int(p) if p.strip() else None for p in parts]
+        except ValueError:
+            raise JsonPathError(f"Fatia inválida: [{content}]")
+        return _slice_step(slice(*bounds)), _MISSING
+    try:
+        indexes = [int(p) for p in content.split(",")]
+    except ValueError:
+        # chave sem aspas, como em `[token]`
+        return _key_step(content), content
+    if len(indexes) == 1:
+        return _index_step(indexes), indexes[0]
+    return _index_step(indexes), _MISSING
+
+
+class JsonPath:
+    """
+    Expressão de caminho compilada em uma lista de passos.
+
+    Sintaxe (subconjunto de JSONPath, compatível com o caminho pontuado):
+        $.data.items[0].id     índices (negativos contam do fim)
+        items.0.id             índice em notação pontuada
+        items[1:3], items[::2] fatias
+        items[*].id, data.*    curingas
+        ['chave.com.ponto']    chaves entre aspas
+        ..id                   busca recursiva
+        items[?(@.ativo)]      filtros: existência/verdade ou comparação
+        items[?(@.preco > 10)] com ==, !=, <, <=, >, >=
+    Um caminho sem curingas, fatias, filtros ou busca recursiva é
+    "singular": `evaluate` devolve o valor em vez de uma lista. Para esses,
+    `keys` lista as chaves (str) e índices (int) literais, usados na
+    extração incremental; é None se houver índice negativo.
+
+    Caminhos não singulares cujo primeiro passo não literal é um curinga ou
+    filtro (`items[*].id`, `data.items[?(@.ativo)]`) também podem ser
+    avaliados elemento a elemento: `prefix` lista as chaves literais até o
+    container e `find_each(item)` aplica o restante do caminho a um de seus
+    elementos. Para os demais, `prefix` é None.
+    """
+    __slots__ = ("expression", "steps", "singular", "keys", "prefix")
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self.steps: list[Step] = []
+        self.singular = True
+        self.keys: Optional[list[Any]] = []
+        self.prefix: Optional[list[Any]] = []
+        self._parse(expression.strip())
+        if not self.singular:
+            self.keys = None
+        else:
+            self.prefix = None
+
+    def _parse(self, expr: str):
+        if expr.startswith("$"):
+            expr = expr[1:]
+        pos = 0
+        recursive = False
+        # `prefix` ainda recebe chaves: só passos literais até aqui
+        open_prefix = True
+        while pos < len(expr):
+            m = _TOKEN_RE.match(expr, pos)
+            if not m:
+                raise JsonPathError(f"Caminho inválido em '{expr[pos:]}'")
+            pos = m.end()
+            if m.group("dot"):
+                continue
+            if m.group("recursive"):
+                recursive = True
+                self.singular = False
+                if open_prefix:
+                    self.prefix, open_prefix = None, False
+                continue
+            elementwise = False
+            if m.group("wild"):
+                step, literal = _wildcard_step, _MISSING
+                elementwise = True
+            elif m.group("bracket") is not None:
+                content = m.group("bracket").strip()
+                step, literal = _bracket_step(content)
+                elementwise = content == "*" or content.startswith("?")
+            else:
+                name = m.group("name").strip()
+                step, literal = _key_step(name), name
+            if recursive:
+                self.steps.append(lambda node: _descendants(node))
+                recursive = False
+            self.steps.append(step)
+            negative = str(literal).startswith("-") and str(literal)[1:].isdigit()
+            if open_prefix and (literal is _MISSING or negative):
+                open_prefix = False
+                if negative or not elementwise:
+                    self.prefix = None
+            elif open_prefix:
+                self.prefix.append(literal)
+            if literal is _MISSING:
+                self.singular = False
+            elif self.keys is not None:
+                if negative:
+                    self.keys = None
+                else:
+                    self.keys.append(literal)
+        if recursive:
+            raise JsonPathError("Caminho não pode terminar em '..'")
+
+    def find(self, data: Any) -> list[Any]:
+        """Todos os valores que casam com o caminho."""
+        return self._apply([data], self.steps)
+
+    def find_each(self, item: Any) -> list[Any]:
+        """
+        Valores que casam com o caminho dentro de `item`, um elemento do
+        container em `prefix`. Somar os resultados de todos os elementos, em
+        ordem, equivale a `find` sobre o documento.
+        """
+        # o curinga/filtro aplicado a [item] produz item ou nada
+        return self._apply([[item]], self.steps[len(self.prefix):])
+
+    @staticmethod
+    def _apply(nodes: list[Any], steps: list[Step]) -> list[Any]:
+        for step in steps:
+            nodes = [child for node in nodes for child in step(node)]
+            if not nodes:
+                break
+        return nodes
+
+    def first(self, data: Any, default: Any = None) -> Any:
+        matches = self.find(data)
+        return matches[0] if matches else default
+
+    def evaluate(self, data: Any) -> Any:
+        """
+        Valor do caminho: o próprio valor se o caminho for singular (KeyError
+        se não existir) ou a lista de valores encontrados.
+        """
+        if not self.singular:
+            return self.find(data)
+        value = self.first(data, _MISSING)
+        if value is _MISSING:
+            raise KeyError(f"Caminho '{self.expression}' não encontrado em '{data}'")
+        return value
+
+
+@lru_cache(maxsize=512)
+def compile_path(expression: str) -> JsonPath:
+    """Compila (com cache LRU por expressão) um caminho."""
+    return JsonPath(expression or "")
+
+
+def evaluate(data: Any, expression: Optional[str]) -> Any:
+    if not expression:
+        return data
+    return compile_path(expression).evaluate(data)
+
+
+def split_root(path: str) -> tuple[str, str]:
+    """Separa `VAR.a[0].b` em ('VAR', 'a[0].b')."""
+    path = (path or "").strip()
+    m = re.match(r"[^.\[]*", path)
+    root = m.group(0).strip()
+    rest = path[m.end():]
+    return root, rest[1:] if rest.startswith(".") and not rest.startswith("..") else rest
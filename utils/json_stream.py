@@ -0,0 +1,254 @@
+import codecs
+import json
+import re
+from typing import Any, Iterable, Iterator, Optional
+
+from utils.json_path import compile_path
+
+_WS_RE = re.compile(r"\s*")
+_NUMBER_RE = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?")
+_LITERALS = {"true": True, "false": False, "null": None}
+_PUNCT = "{}[]:,"
+
+# buffer já consumido é descartado quando passa deste tamanho
+_COMPACT_AT = 64 * 1024
+# caminhos que exigem o documento inteiro só são avaliados até este tamanho
+BUFFERED_MAX_BYTES = 8 * 1024 * 1024
+
+
+class ResponseTooLargeError(ValueError):
+    """A resposta excedeu o limite de bytes configurado."""
+
+
+class JsonStreamError(ValueError):
+    """JSON malformado na resposta."""
+
+
+class _Tokenizer:
+    """
+    Tokenizador JSON incremental sobre blocos de bytes.
+
+    Mantém só o trecho ainda não consumido do texto; pede mais blocos quando
+    um token pode continuar no próximo. Tokens: um dos caracteres de
+    pontuação, ("s", texto) para strings e ("v", valor) para números e
+    literais.
+    """
+    def __init__(self, chunks: Iterable[bytes], max_bytes: Optional[int]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self._eof = True
+            self._buf += self._decoder.decode(b"", final=True)
+            return False
+        self.bytes_read += len(chunk)
+        if self.max_bytes is not None and self.bytes_read > self.max_bytes:
+            raise ResponseTooLargeError(f"Resposta excede o limite de {self.max_bytes} bytes")
+        if self._pos > _COMPACT_AT:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        self._buf += self._decoder.decode(chunk)
+        return True
+
+    def next(self):
+        while True:
+            self._pos = _WS_RE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                break
+            if not self._fill():
+                raise JsonStreamError("Fim inesperado do JSON")
+
+        ch = self._buf[self._pos]
+        if ch in _PUNCT:
+            self._pos += 1
+            return ch
+        if ch == '"':
+            # procura a aspa final a partir de onde parou, sem reler a string
+            scanned = 1
+            while True:
+                end = self._buf.find('"', self._pos + scanned)
+                if end < 0:
+                    scanned = len(self._buf) - self._pos
+                    if not self._fill():
+                        raise JsonStreamError("String não terminada")
+                    continue
+                slashes = 0
+                while self._buf[end - 1 - slashes] == "\\":
+                    slashes += 1
+                if slashes % 2:
+                    scanned = end + 1 - self._pos
+                    continue
+                raw = self._buf[self._pos + 1:end]
+                self._pos = end + 1
+                return ("s", json.loads(f'"{raw}"') if "\\" in raw else raw)
+        while True:
+            m = _NUMBER_RE.match(self._buf, self._pos)
+            word = m.group(0) if m else self._buf[self._pos:self._pos + 5]
+            # um número pode continuar no próximo bloco ("1" + ".5", "2e" + "+3")
+            near_end = len(self._buf) - (m.end() if m else self._pos) < (3 if m else 5)
+            if near_end and self._fill():
+                continue
+            if m:
+                self._pos = m.end()
+                text = m.group(0)
+                return ("v", float(text) if any(c in text for c in ".eE") else int(text))
+            for literal, value in _LITERALS.items():
+                if word.startswith(literal):
+                    self._pos += len(literal)
+                    return ("v", value)
+            raise JsonStreamError(f"Token inválido próximo de '{self._buf[self._pos:self._pos + 20]}'")
+
+
+def _skip(tok, tokens: _Tokenizer):
+    """Consome o valor que começa em `tok` sem construí-lo."""
+    if tok not in ("{", "["):
+        return
+    depth = 1
+    while depth:
+        t = tokens.next()
+        if t in ("{", "["):
+            depth += 1
+        elif t in ("}", "]"):
+            depth -= 1
+
+
+def _build(tok, tokens: _Tokenizer) -> Any:
+    """Constrói o valor que começa em `tok`."""
+    if tok == "{":
+        obj = {}
+        t = tokens.next()
+        while t != "}":
+            if not isinstance(t, tuple) or t[0] != "s":
+                raise JsonStreamError("Chave de objeto inválida")
+            if tokens.next() != ":":
+                raise JsonStreamError("':' esperado")
+            obj[t[1]] = _build(tokens.next(), tokens)
+            t = tokens.next()
+            if t == ",":
+                t = tokens.next()
+        return obj
+    if tok == "[":
+        arr = []
+        t = tokens.next()
+        while t != "]":
+            arr.append(_build(t, tokens))
+            t = tokens.next()
+            if t == ",":
+                t = tokens.next()
+        return arr
+    if isinstance(tok, tuple):
+        return tok[1]
+    raise JsonStreamError(f"Valor esperado, encontrado '{tok}'")
+
+
+def _descend(tok, key, tokens: _Tokenizer):
+    """
+    A partir do container em `tok`, avança até o valor de `key` e retorna
+    seu primeiro token, ou levanta KeyError.
+    """
+    if tok == "{":
+        t = tokens.next()
+        while t != "}":
+            if not isinstance(t, tuple) or t[0] != "s" or tokens.next() != ":":
+                raise JsonStreamError("Objeto malformado")
+            value = tokens.next()
+            if t[1] == str(key):
+                return value
+            _skip(value, tokens)
+            t = tokens.next()
+            if t == ",":
+                t = tokens.next()
+    elif tok == "[" and str(key).isdigit():
+        index, i = int(key), 0
+        t = tokens.next()
+        while t != "]":
+            if i == index:
+                return t
+            _skip(t, tokens)
+            i += 1
+            t = tokens.next()
+            if t == ",":
+                t = tokens.next()
+    raise KeyError(f"Chave '{key}' não encontrada")
+
+
+def _iter_elements(tok, tokens: _Tokenizer) -> Iterator[Any]:
+    """Constrói, um de cada vez, os elementos do container em `tok`."""
+    if tok == "{":
+        t = tokens.next()
+        while t != "}":
+            if not isinstance(t, tuple) or t[0] != "s" or tokens.next() != ":":
+                raise JsonStreamError("Objeto malformado")
+            yield _build(tokens.next(), tokens)
+            t = tokens.next()
+            if t == ",":
+                t = tokens.next()
+    elif tok == "[":
+        t = tokens.next()
+        while t != "]":
+            yield _build(t, tokens)
+            t = tokens.next()
+            if t == ",":
+                t = tokens.next()
+
+
+def iter_limited(chunks: Iterable[bytes], max_bytes: Optional[int]) -> Iterator[bytes]:
+    """Repassa os blocos, levantando ResponseTooLargeError acima de `max_bytes`."""
+    total = 0
+    for chunk in chunks:
+        total += len(chunk)
+        if max_bytes is not None and total > max_bytes:
+            raise ResponseTooLargeError(f"Resposta excede o limite de {max_bytes} bytes")
+        yield chunk
+
+
+def extract_stream(chunks: Iterable[bytes],
+                   expression: str = "",
+                   max_bytes: Optional[int] = None,
+                   buffered_max_bytes: Optional[int] = BUFFERED_MAX_BYTES) -> Any:
+    """
+    Extrai `expression` de um JSON recebido em blocos, lendo só até o fim do
+    valor procurado, com a leitura limitada a `max_bytes`
+    (ResponseTooLargeError acima).
+
+    Caminhos singulares (chaves e índices literais) são percorridos sem
+    montar o restante do documento. Curingas e filtros após chaves literais
+    (`items[*].id`, `items[?(@.ativo)]`) montam um elemento do container por
+    vez; só os resultados ficam em memória. Os demais caminhos (fatias,
+    índices negativos, busca recursiva, várias chaves) precisam do documento
+    inteiro e são recusados acima de `buffered_max_bytes`.
+    """
+    path = compile_path(expression or "")
+    if path.keys is None and path.prefix is None:
+        limits = [n for n in (max_bytes, buffered_max_bytes) if n is not None]
+        text = b"".join(iter_limited(chunks, min(limits) if limits else None)).decode("utf-8", errors="replace")
+        return path.evaluate(json.loads(text))
+    tokens = _Tokenizer(chunks, max_bytes)
+    if path.keys is None:
+        tok = tokens.next()
+        try:
+            for key in path.prefix:
+                tok = _descend(tok, key, tokens)
+        except KeyError:
+            return []
+        results = []
+        for item in _iter_elements(tok, tokens):
+            results.extend(path.find_each(item))
+        return results
+    tok = tokens.next()
+    for key in path.keys:
+        try:
+            tok = _descend(tok, key, tokens)
+        except KeyError:
+            raise KeyError(f"Caminho '{expression}' não encontrado")
+    return _build(tok, tokens)
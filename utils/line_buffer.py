@@ -0,0 +1,103 @@
+import mmap
+import tempfile
+from array import array
+from typing import Iterator
+
+# linhas maiores são quebradas em trechos de até este número de bytes
+ROW_BYTES = 4096
+_WRITE_CHARS = 1024 * 1024
+
+
+class LineBuffer:
+    """
+    Texto guardado num arquivo temporário mapeado em memória, com índice de
+    linhas para leitura sob demanda.
+
+    O texto é gravado em UTF-8 em blocos e indexado uma única vez: cada
+    "linha de exibição" (row) é uma linha do texto ou um trecho de até
+    ROW_BYTES bytes dela, então JSON minificado numa só linha também é
+    paginado. `rows(start, count)` decodifica só o trecho pedido; o sistema
+    operacional decide o que do arquivo fica em memória.
+    """
+    def __init__(self, text: str):
+        self._file = tempfile.TemporaryFile(prefix="response-")
+        for i in range(0, len(text), _WRITE_CHARS):
+            self._file.write(text[i:i + _WRITE_CHARS].encode("utf-8", errors="replace"))
+        self._file.flush()
+        self.size = self._file.tell()
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+        # início de cada row e o número (0-based) da linha à qual pertence
+        self._starts = array("Q")
+        self._lines = array("Q")
+        self.line_count = 0
+        self._index()
+
+    def _index(self):
+        mm, size = self._mm, self.size
+        pos, line = 0, 0
+        while True:
+            end = mm.find(b"\n", pos) if mm is not None else -1
+            stop = size if end < 0 else end
+            start = pos
+            while True:
+                self._starts.append(start)
+                self._lines.append(line)
+                if stop - start <= ROW_BYTES:
+                    break
+                cut = start + ROW_BYTES
+                # não corta no meio de um caractere UTF-8
+                while cut > start + 1 and mm[cut] & 0xC0 == 0x80:
+                    cut -= 1
+                start = cut
+            line += 1
+            if end < 0:
+                break
+            pos = end + 1
+        self.line_count = line
+        # sentinela: o fim da última row, como se houvesse um "\n" após o texto
+        self._starts.append(size + 1)
+        self._lines.append(line)
+
+    @property
+    def row_count(self) -> int:
+        return len(self._starts) - 1
+
+    def line_of(self, row: int) -> int:
+        """Número (0-based) da linha do texto a que a row pertence."""
+        return self._lines[row]
+
+    def starts_line(self, row: int) -> bool:
+        return row == 0 or self._lines[row] != self._lines[row - 1]
+
+    def row(self, row: int) -> str:
+        start, end = self._starts[row], self._starts[row + 1]
+        if self._lines[row + 1] != self._lines[row]:
+            end -= 1                            # descarta o "\n"
+        if self._mm is None or end <= start:
+            return ""
+        return self._mm[start:end].decode("utf-8", errors="replace").rstrip("\r")
+
+    def rows(self, start: int, count: int) -> Iterator[str]:
+        for row in range(max(start, 0), min(start + count, self.row_count)):
+            yield self.row(row)
+
+    def text(self, start: int, count: int) -> str:
+        """Texto das rows pedidas, com as linhas separadas por "\n"."""
+        parts = []
+        for row in range(max(start, 0), min(start + count, self.row_count)):
+            if parts and self.starts_line(row):
+                parts.append("\n")
+            parts.append(self.row(row))
+        return "".join(parts)
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
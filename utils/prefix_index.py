@@ -0,0 +1,60 @@
+from bisect import bisect_left, insort
+from threading import RLock
+from typing import Iterable, Optional
+
+
+class PrefixIndex:
+    """
+    Índice ordenado de nomes para busca por prefixo sem diferenciar maiúsculas.
+
+    Mantém uma lista ordenada de pares (nome normalizado, nome original) e usa
+    busca binária para localizar o primeiro candidato, então a busca custa
+    O(log n + k) para k resultados. Nomes repetidos são aceitos (multiconjunto).
+    """
+    def __init__(self, names: Iterable[str] = ()):
+        self._lock = RLock()
+        self._entries: list[tuple[str, str]] = sorted((self._fold(n), n) for n in names)
+
+    @staticmethod
+    def _fold(name: str) -> str:
+        return (name or "").casefold()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def reset(self, names: Iterable[str]):
+        entries = sorted((self._fold(n), n) for n in names)
+        with self._lock:
+            self._entries = entries
+
+    def add(self, name: str):
+        with self._lock:
+            insort(self._entries, (self._fold(name), name))
+
+    def remove(self, name: str):
+        entry = (self._fold(name), name)
+        with self._lock:
+            i = bisect_left(self._entries, entry)
+            if i < len(self._entries) and self._entries[i] == entry:
+                del self._entries[i]
+
+    def rename(self, old: str, new: str):
+        with self._lock:
+            self.remove(old)
+            self.add(new)
+
+    def search(self, prefix: str, limit: Optional[int] = None) -> list[str]:
+        """Retorna os nomes que começam com `prefix`, em ordem alfabética."""
+        folded = self._fold(prefix)
+        results = []
+        with self._lock:
+            entries = self._entries
+            i = bisect_left(entries, (folded, ""))
+            while i < len(entries) and entries[i][0].startswith(folded):
+                name = entries[i][1]
+                if not results or results[-1] != name:
+                    results.append(name)
+                    if limit is not None and len(results) >= limit:
+                        break
+                i += 1
+        return results
@@ -0,0 +1,93 @@
+import re
+from functools import lru_cache
+from typing import Callable, NamedTuple, Optional, Union
+
+from utils.json_path import split_root
+
+PLACEHOLDER_RE = re.compile(r"\{\{\s*([^{}]+?)\s*\}\}")
+
+
+class Reference(NamedTuple):
+    """Placeholder `{{VAR.a[0].b}}`: caminho, variável raiz, expressão e posição no texto."""
+    path: str
+    root: str
+    expr: str
+    start: int
+    end: int
+
+
+class Template:
+    """
+    Texto compilado em segmentos literais e referências.
+
+    `render` apenas junta os segmentos, chamando `resolve` para cada
+    referência.
+    """
+    __slots__ = ("source", "segments", "references")
+
+    def __init__(self, source: str):
+        self.source = source
+        segments: list[Union[str, Reference]] = []
+        references: list[Reference] = []
+        last = 0
+        for m in PLACEHOLDER_RE.finditer(source):
+            if m.start() > last:
+                segments.append(source[last:m.start()])
+            root, expr = split_root(m.group(1))
+            if root:
+                ref = Reference(m.group(1), root, expr, m.start(), m.end())
+                segments.append(ref)
+                references.append(ref)
+            else:
+                segments.append(m.group(0))
+            last = m.end()
+        if last < len(source):
+            segments.append(source[last:])
+        self.segments = tuple(segments)
+        self.references = tuple(references)
+
+    @property
+    def is_literal(self) -> bool:
+        return not self.references
+
+    def names(self) -> set[str]:
+        return {ref.root for ref in self.references}
+
+    def render(self, resolve: Callable[[Reference], str]) -> str:
+        return "".join(seg if isinstance(seg, str) else resolve(seg) for seg in self.segments)
+
+    def placeholder_start(self, pos: int) -> int:
+        """
+        Posição do '{{' do placeholder que contém `pos` (fechado ou ainda
+        sendo digitado), ou -1.
+        """
+        for ref in self.references:
+            if ref.start > pos:
+                break
+            if ref.start + 2 <= pos <= ref.end - 2:
+                return ref.start
+        start = self.source.rfind("{{", 0, pos)
+        if start != -1 and "}}" not in self.source[start + 2:pos]:
+            return start
+        return -1
+
+
+# textos maiores (corpos e respostas) são compilados sem passar pelo cache,
+# que não deve prender documentos grandes em memória
+CACHE_MAX_CHARS = 4096
+
+
+@lru_cache(maxsize=1024)
+def _compile_cached(source: str) -> Template:
+    return Template(source)
+
+
+def compile_template(source: Optional[str]) -> Template:
+    """
+    Compila um texto com placeholders. Textos de até CACHE_MAX_CHARS
+    caracteres ficam num cache LRU por texto.
+    """
+    source = source or ""
+    if len(source) > CACHE_MAX_CHARS:
+        return Template(source)
+    return _compile_cached(source)